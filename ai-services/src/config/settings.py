@@ -1,11 +1,19 @@
 # AI Services Configuration for DataTrack-KMRL
 # Google Cloud Vision & Translation API Settings
 
+from __future__ import annotations
+
 import os
 import json
-from typing import Dict, Any
-from google.oauth2 import service_account
-from google.cloud import vision, translate_v2 as translate
+import functools
+import threading
+from typing import TYPE_CHECKING, Dict, Any, Optional
+
+# The Google SDKs are imported inside the client factories so services that are
+# never used don't pay their import time and memory at startup
+if TYPE_CHECKING:
+    from google.oauth2 import service_account
+    from google.cloud import vision, translate_v2 as translate
 
 class Config:
     """Configuration management for Google Cloud services - DataTrack KMRL"""
@@ -14,6 +22,20 @@ class Config:
     
     PROJECT_ID = "aiagent-465805"
     
+    # Keep-alive connections held by the Translation REST session
+    TRANSLATE_HTTP_POOL_SIZE = 64
+    
+    # Gemini tier limits for the API key (free tier defaults), set per deployment tier
+    GEMINI_REQUESTS_PER_MINUTE = int(os.getenv('GEMINI_REQUESTS_PER_MINUTE', '20'))
+    GEMINI_TOKENS_PER_MINUTE = int(os.getenv('GEMINI_TOKENS_PER_MINUTE', '1000000'))
+    
+    # Longest a chat request may queue for Gemini capacity before it is rejected with 429
+    GEMINI_MAX_QUEUE_WAIT_SECONDS = float(os.getenv('GEMINI_MAX_QUEUE_WAIT_SECONDS', '30'))
+    
+    # API key google.generativeai is currently configured with (see configure_genai)
+    _genai_api_key: Optional[str] = None
+    _genai_lock = threading.Lock()
+    
     # KMRL Specific Language Mappings (English + Malayalam focus)
     LANGUAGE_NAMES = {
         # KMRL Primary Languages
@@ -48,6 +70,8 @@ class Config:
     @classmethod
     def get_credentials(cls) -> service_account.Credentials:
         """Get Google Cloud credentials from environment variable"""
+        from google.oauth2 import service_account
+        
         print("[CONFIG] Loading Google Cloud credentials for DataTrack-KMRL...")
         
         # Load from environment variable (required for security)
@@ -65,6 +89,8 @@ class Config:
     @classmethod
     def get_vision_client(cls) -> vision.ImageAnnotatorClient:
         """Get configured Vision API client for OCR processing"""
+        from google.cloud import vision
+        
         try:
             credentials = cls.get_credentials()
             print("[CONFIG] Initializing Google Vision client...")
@@ -77,14 +103,50 @@ class Config:
             print(f"[CONFIG] ❌ Failed to create Vision client: {e}")
             raise
     
+    @classmethod
+    def get_vision_async_client(cls) -> vision.ImageAnnotatorAsyncClient:
+        """Get configured async Vision API client for concurrent OCR processing"""
+        from google.cloud import vision
+        
+        credentials = cls.get_credentials()
+        print("[CONFIG] Initializing Google Vision async client...")
+        return vision.ImageAnnotatorAsyncClient(credentials=credentials)
+    
     @classmethod
     def get_translate_client(cls) -> translate.Client:
         """Get configured Translation API client"""
+        from google.auth.transport.requests import AuthorizedSession
+        from google.cloud import translate_v2 as translate
+        from requests.adapters import HTTPAdapter
+        
         credentials = cls.get_credentials()
         print("[CONFIG] Initializing Google Translation client...")
-        return translate.Client(credentials=credentials)
+        # Translation v2 is REST; give its session a larger keep-alive pool
+        session = AuthorizedSession(credentials)
+        adapter = HTTPAdapter(pool_connections=cls.TRANSLATE_HTTP_POOL_SIZE,
+                              pool_maxsize=cls.TRANSLATE_HTTP_POOL_SIZE)
+        session.mount("https://", adapter)
+        return translate.Client(credentials=credentials, _http=session)
+    
+    @classmethod
+    def configure_genai(cls, api_key: str) -> None:
+        """
+        Configure google.generativeai for the process unless it already uses this key
+        
+        genai.configure replaces the SDK's clients and their open gRPC (HTTP/2)
+        channels, so the chat, video and audio services share this one call and
+        keep multiplexing requests over the same connections.
+        """
+        import google.generativeai as genai
+        
+        with cls._genai_lock:
+            if cls._genai_api_key != api_key:
+                print("[CONFIG] Configuring Gemini SDK...")
+                genai.configure(api_key=api_key, transport="grpc")
+                cls._genai_api_key = api_key
     
     @classmethod
+    @functools.lru_cache(maxsize=512)
     def get_language_name(cls, language_code: str) -> str:
         """Convert language code to full name"""
         return cls.LANGUAGE_NAMES.get(language_code, language_code.upper())
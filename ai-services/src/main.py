@@ -1,8 +1,12 @@
 # DataTrack KMRL - Main FastAPI Application
 # OCR and Document Processing Server for KMRL Metro Rail
 
+import atexit
+import queue
 import time
 import uuid
+import logging
+import logging.handlers
 from datetime import datetime
 from typing import Union, Dict, List, Optional, Any
 from fastapi import FastAPI, File, UploadFile, HTTPException, Depends, Body, Request
@@ -15,6 +19,21 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 
+# Service modules log through module loggers; keep their INFO messages visible.
+# Records are only enqueued by the threads that log them; a single listener thread
+# formats and writes them, so concurrent workers don't contend on stdout
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter('%(levelname)s: %(message)s'))
+_log_queue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_handler)
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+# The queue handler only merges args into the message; the listener's handler adds the level
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
+_log_listener.start()
+# Flush whatever is still queued when the process exits
+atexit.register(_log_listener.stop)
+
 # Add current directory to path for imports
 sys.path.append(os.path.dirname(__file__))
 
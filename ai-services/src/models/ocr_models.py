@@ -2,7 +2,9 @@
 # Type-safe data structures for document processing
 # Supports images, PDFs, and Word documents
 
-from dataclasses import dataclass
+from array import array
+from dataclasses import dataclass, field
+from itertools import compress
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
@@ -35,6 +37,104 @@ class OCRResult:
             'word_count': self.word_count
         }
 
+@dataclass
+class DocumentFeatures:
+    """Document structure from Vision OCR, stored column-wise (one sequence per attribute)"""
+    has_text: bool
+    page_count: int
+    block_confidences: array = field(default_factory=lambda: array('d'))
+    block_types: List[str] = field(default_factory=list)
+    paragraph_confidences: array = field(default_factory=lambda: array('d'))
+    word_confidences: array = field(default_factory=lambda: array('d'))
+    word_texts: List[str] = field(default_factory=list, repr=False)
+    
+    def words_above(self, min_confidence: float) -> List[str]:
+        """Texts of words whose confidence is at least min_confidence"""
+        return list(compress(self.word_texts, [confidence >= min_confidence for confidence in self.word_confidences]))
+    
+    def copy(self) -> 'DocumentFeatures':
+        """Independent copy whose columns can be modified without affecting this one"""
+        return DocumentFeatures(
+            has_text=self.has_text,
+            page_count=self.page_count,
+            block_confidences=array('d', self.block_confidences),
+            block_types=list(self.block_types),
+            paragraph_confidences=array('d', self.paragraph_confidences),
+            word_confidences=array('d', self.word_confidences),
+            word_texts=list(self.word_texts)
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the list-of-objects dictionary used by API responses"""
+        return {
+            'has_text': self.has_text,
+            'page_count': self.page_count,
+            'blocks': [{'confidence': confidence, 'block_type': block_type}
+                       for confidence, block_type in zip(self.block_confidences, self.block_types)],
+            'paragraphs': [{'confidence': confidence} for confidence in self.paragraph_confidences],
+            'words': [{'confidence': confidence, 'text': text}
+                      for confidence, text in zip(self.word_confidences, self.word_texts)]
+        }
+
+@dataclass
+class DocumentAnnotation:
+    """One image's document text detection, decoded once from the Vision response"""
+    text: str
+    confidence: float  # First-page confidence
+    features: DocumentFeatures = field(default_factory=lambda: DocumentFeatures(has_text=False, page_count=0))
+    error: Optional[str] = None
+
+@dataclass
+class DocumentAnalysis:
+    """Combined OCR, structure and handwriting views of one image - single Vision request"""
+    ocr: OCRResult
+    features: Optional[DocumentFeatures] = None
+    handwriting_confidence: float = 0.0
+    error: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'ocr': self.ocr.to_dict(),
+            'features': self.features.to_dict() if self.features else None,
+            'handwriting_confidence': self.handwriting_confidence,
+            'error': self.error
+        }
+
+@dataclass(slots=True)
+class VideoAnalysisResult:
+    """Result from Gemini video analysis - slotted, since batches create many of these"""
+    summary: str
+    key_elements: Any  # Gemini usually returns lists here; kept as returned
+    visible_text: Any
+    theme: Any
+    activities: Any
+    technical_notes: Any
+    confidence: float
+    filename: str
+    file_size_mb: float
+    mime_type: str
+    analysis_type: str = 'video'
+    processed_by: str = 'gemini-2.0-flash-exp'
+    error: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for API responses"""
+        return {
+            'summary': self.summary,
+            'key_elements': self.key_elements,
+            'visible_text': self.visible_text,
+            'theme': self.theme,
+            'activities': self.activities,
+            'technical_notes': self.technical_notes,
+            'confidence': self.confidence,
+            'filename': self.filename,
+            'file_size_mb': self.file_size_mb,
+            'mime_type': self.mime_type,
+            'analysis_type': self.analysis_type,
+            'processed_by': self.processed_by,
+            'error': self.error
+        }
+
 @dataclass
 class LanguageDetectionResult:
     """Result from language detection - Supporting English/Malayalam for KMRL"""
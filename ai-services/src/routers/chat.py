@@ -2,10 +2,15 @@
 Chat Router - Simple chat API endpoint using Gemini via LangChain
 """
 
+import json
+import logging
 from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
-from services.gemini_client import GeminiClient
+from services.gemini_client import GeminiClient, GeminiRateLimitError
+
+logger = logging.getLogger(__name__)
 
 # Create router
 router = APIRouter(
@@ -44,6 +49,12 @@ class SystemPromptResponse(BaseModel):
     success: bool
     message: str
 
+def _rate_limited(e: GeminiRateLimitError) -> HTTPException:
+    """429 response telling the caller when Gemini capacity frees up"""
+    logger.warning("[CHAT] ⚠️ %s", e)
+    return HTTPException(status_code=429, detail=str(e),
+                         headers={"Retry-After": str(max(1, round(e.retry_after)))})
+
 # Dependency for the Gemini client
 def get_gemini_client(system_prompt: str = None) -> GeminiClient:
     """Dependency injection for Gemini client"""
@@ -80,7 +91,7 @@ async def update_system_prompt(request: SystemPromptRequest):
     
     try:
         CURRENT_SYSTEM_PROMPT = request.system_prompt
-        print(f"[CHAT] System prompt updated successfully")
+        logger.info("[CHAT] System prompt updated successfully")
         
         return SystemPromptResponse(
             system_prompt=CURRENT_SYSTEM_PROMPT,
@@ -89,7 +100,7 @@ async def update_system_prompt(request: SystemPromptRequest):
         )
     except Exception as e:
         error_msg = f"Failed to update system prompt: {str(e)}"
-        print(f"[CHAT] ❌ {error_msg}")
+        logger.error("[CHAT] ❌ %s", error_msg)
         
         return SystemPromptResponse(
             system_prompt=CURRENT_SYSTEM_PROMPT or GeminiClient.DEFAULT_SYSTEM_PROMPT,
@@ -123,26 +134,29 @@ async def simple_chat(
     - **system_prompt**: Optional custom system prompt to control AI behavior
     """
     try:
-        print(f"[CHAT] Processing chat request: '{request.message[:30]}...'")
+        # %.Ns truncates lazily, so no preview string is built unless the record is emitted
+        logger.info("[CHAT] Processing chat request: '%.30s...'", request.message)
         
         # Debug the system prompt
         if request.system_prompt:
-            print(f"[CHAT API] Request includes custom system prompt: {request.system_prompt[:50]}...")
+            logger.debug("[CHAT API] Request includes custom system prompt: %.50s...", request.system_prompt)
         else:
-            print(f"[CHAT API] Using default or global system prompt")
+            logger.debug("[CHAT API] Using default or global system prompt")
             
         # Create Gemini client with system prompt if provided
         gemini_client = get_gemini_client(system_prompt=request.system_prompt)
         
         # Get response from Gemini
-        response = gemini_client.chat(request.message)
+        response = await gemini_client.chat(request.message)
         
-        print(f"[CHAT] Response generated successfully")
+        logger.info("[CHAT] Response generated successfully")
         return ChatResponse(response=response)
         
+    except GeminiRateLimitError as e:
+        raise _rate_limited(e)
     except Exception as e:
         error_msg = f"Chat processing failed: {str(e)}"
-        print(f"[CHAT] ❌ {error_msg}")
+        logger.error("[CHAT] ❌ %s", error_msg)
         raise HTTPException(status_code=500, detail=error_msg)
 
 # Simplified chat endpoint (no system prompt option)
@@ -158,18 +172,57 @@ async def message_only_chat(
     - **message**: Your message to Gemini
     """
     try:
-        print(f"[CHAT] Processing simplified message: '{request.message[:30]}...'")
+        logger.info("[CHAT] Processing simplified message: '%.30s...'", request.message)
         
         # Create Gemini client with default system prompt
         gemini_client = get_gemini_client()
         
         # Get response from Gemini
-        response = gemini_client.chat(request.message)
+        response = await gemini_client.chat(request.message)
         
-        print(f"[CHAT] Response generated successfully")
+        logger.info("[CHAT] Response generated successfully")
         return ChatResponse(response=response)
         
+    except GeminiRateLimitError as e:
+        raise _rate_limited(e)
     except Exception as e:
         error_msg = f"Chat processing failed: {str(e)}"
-        print(f"[CHAT] ❌ {error_msg}")
-        raise HTTPException(status_code=500, detail=error_msg)
\ No newline at end of file
+        logger.error("[CHAT] ❌ %s", error_msg)
+        raise HTTPException(status_code=500, detail=error_msg)
+
+# Streaming chat endpoint (system prompt optional)
+@router.post("/stream")
+async def stream_chat(
+    request: ChatRequest
+):
+    """
+    Streaming chat endpoint with Gemini
+    
+    Same request as /simple, but the reply is sent as server-sent events while it is
+    generated: one `data: {"text": ...}` event per chunk, then `data: [DONE]`.
+    
+    - **message**: Your message to Gemini
+    - **system_prompt**: Optional custom system prompt to control AI behavior
+    """
+    logger.info("[CHAT] Processing streaming chat request: '%.30s...'", request.message)
+    
+    # Create Gemini client with system prompt if provided
+    gemini_client = get_gemini_client(system_prompt=request.system_prompt)
+    
+    # Pull the first chunk before responding so a full rate limit queue is still a 429
+    chunks = gemini_client.chat_stream(request.message)
+    try:
+        first_chunk = await chunks.__anext__()
+    except GeminiRateLimitError as e:
+        raise _rate_limited(e)
+    except StopAsyncIteration:
+        first_chunk = None
+    
+    async def event_stream():
+        if first_chunk is not None:
+            yield f"data: {json.dumps({'text': first_chunk})}\n\n"
+            async for chunk in chunks:
+                yield f"data: {json.dumps({'text': chunk})}\n\n"
+        yield "data: [DONE]\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
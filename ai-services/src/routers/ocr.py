@@ -5,13 +5,12 @@ from typing import Optional
 from datetime import datetime
 import uuid
 import os
-import io
 import time
 import sys
 import json
+import re
 import asyncio
 from PIL import Image
-import pypdfium2 as pdfium
 import PyPDF2  # Added for direct PDF text extraction
 import docx2txt
 import tempfile
@@ -21,7 +20,7 @@ import mimetypes
 # Add parent directories to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from services.ocr_service import VisionService
+from services.ocr_service import VisionService, get_pdf_page_count, render_pdf_page
 from services.classification_service import ClassificationService
 from services.extraction_service import EntityExtractionService
 from services.video_analysis_service import VideoAnalysisService
@@ -30,6 +29,9 @@ from utils.preprocessing import preprocess_image
 from utils.postprocessing import clean_extracted_text
 from utils.helpers import generate_processing_id
 
+# Malayalam Unicode block, counted by the regex engine instead of a per-character Python loop
+MALAYALAM_CHAR_PATTERN = re.compile('[\u0D00-\u0D7F]')
+
 # Initialize router
 router = APIRouter(prefix="/api/documents", tags=["document-processing"])
 
@@ -278,17 +280,17 @@ async def process_document(
             
             try:
                 # Analyze video using Gemini
-                video_analysis = video_service.analyze_video(temp_file_path, file.filename)
+                video_analysis = await video_service.analyze_video_async(temp_file_path, file.filename)
                 
-                if video_analysis.get('error'):
+                if video_analysis.error:
                     raise HTTPException(
                         status_code=422,
-                        detail=f"Video analysis failed: {video_analysis['error']}"
+                        detail=f"Video analysis failed: {video_analysis.error}"
                     )
                 
                 # Use the summary as extracted text for consistency with other document types
-                extracted_text = video_analysis.get('summary', '')
-                confidence = video_analysis.get('confidence', 0.8)
+                extracted_text = video_analysis.summary
+                confidence = video_analysis.confidence
                 
                 # Store video analysis results for later retrieval
                 video_analysis_data = video_analysis
@@ -430,7 +432,7 @@ async def process_document(
         
         # Add video analysis data if available
         if 'video_analysis_data' in locals():
-            result["video_analysis"] = video_analysis_data
+            result["video_analysis"] = video_analysis_data.to_dict()
             result["processing_info"]["analysis_type"] = "video"
         
         # Add audio analysis data if available
@@ -641,7 +643,7 @@ async def detect_language(text: str):
         
         # Simple detection - check for Malayalam unicode range
         try:
-            malayalam_chars = sum(1 for char in detection_text if '\u0D00' <= char <= '\u0D7F')
+            malayalam_chars = len(MALAYALAM_CHAR_PATTERN.findall(detection_text))
             total_chars = len(detection_text.strip())
             
             if total_chars == 0:
@@ -860,37 +862,45 @@ async def process_pdf(pdf_path: str, ocr_method: str):
             
             # Fall back to OCR for scanned PDFs
             try:
-                # Load PDF document for OCR processing
-                pdf = pdfium.PdfDocument(pdf_path)
-                page_count = len(pdf)
+                # PDFium calls go through the OCR service, which serializes them on its
+                # lock and runs here in worker threads, off the event loop
+                page_count = await asyncio.to_thread(get_pdf_page_count, pdf_path)
                 
                 # Reset counters
                 all_text = []
                 total_confidence = 0.0
                 processed_pages = 0
                 
-                for page_num in range(page_count):
-                    try:
-                        # Render page to image
-                        page = pdf.get_page(page_num)
-                        bitmap = page.render(scale=2.0, rotation=0, crop=(0, 0, 0, 0))
-                        pil_image = bitmap.to_pil()
-                        
-                        # Save image to bytes for OCR
-                        img_byte_arr = io.BytesIO()
-                        pil_image.save(img_byte_arr, format='PNG')
-                        img_bytes = img_byte_arr.getvalue()
-                        
-                        # Extract text using OCR
-                        ocr_result = await vision_service.extract_text_async(img_bytes, method=ocr_method)
-                        
-                        if ocr_result.text:
-                            all_text.append(ocr_result.text)
-                            total_confidence += ocr_result.confidence
-                            processed_pages += 1
-                            print(f"[API] OCR processed page {page_num + 1}/{page_count} - {len(ocr_result.text)} chars")
-                    except Exception as e:
-                        print(f"[API] ⚠️ Error in OCR processing of PDF page {page_num + 1}: {str(e)}. Skipping page.")
+                # Send the PDF itself to Vision, several pages per request
+                try:
+                    page_results = await asyncio.to_thread(vision_service.extract_text_pdf, pdf_path, page_count, ocr_method)
+                except Exception as e:
+                    print(f"[API] ⚠️ Vision PDF OCR failed: {str(e)}. Rendering pages instead...")
+                    page_results = []
+                for page_num, ocr_result in enumerate(page_results):
+                    if ocr_result.text:
+                        all_text.append(ocr_result.text)
+                        total_confidence += ocr_result.confidence
+                        processed_pages += 1
+                        print(f"[API] OCR processed page {page_num + 1}/{page_count} - {len(ocr_result.text)} chars")
+                
+                # Render and OCR page by page only if the files API returned nothing
+                if processed_pages == 0:
+                    for page_num in range(page_count):
+                        try:
+                            # Render page to a PNG image for OCR
+                            img_bytes = await asyncio.to_thread(render_pdf_page, pdf_path, page_num, 2.0)
+                            
+                            # Extract text using OCR
+                            ocr_result = await vision_service.extract_text_async(img_bytes, method=ocr_method)
+                            
+                            if ocr_result.text:
+                                all_text.append(ocr_result.text)
+                                total_confidence += ocr_result.confidence
+                                processed_pages += 1
+                                print(f"[API] OCR processed page {page_num + 1}/{page_count} - {len(ocr_result.text)} chars")
+                        except Exception as e:
+                            print(f"[API] ⚠️ Error in OCR processing of PDF page {page_num + 1}: {str(e)}. Skipping page.")
                 
                 if processed_pages > 0:
                     extracted_text = "\n\n".join(all_text)
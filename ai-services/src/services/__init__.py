@@ -1 +1,6 @@
-# Services init
\ No newline at end of file
+# Services init
+
+import logging
+
+# Service modules log via logging.getLogger(__name__); stay silent unless the app configures logging
+logging.getLogger(__name__).addHandler(logging.NullHandler())
@@ -8,6 +8,22 @@ import tempfile
 import os
 from typing import Dict, Any, Optional
 import mimetypes
+import sys
+
+# Add parent directories to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import Config
+
+
+# Fallbacks for extensions mimetypes doesn't map to an audio/* type
+_AUDIO_MIME_TYPES = {
+    '.mp3': 'audio/mpeg',
+    '.wav': 'audio/wav',
+    '.m4a': 'audio/mp4',
+    '.aac': 'audio/aac',
+    '.flac': 'audio/flac'
+}
 
 
 class AudioAnalysisService:
@@ -16,7 +32,8 @@ class AudioAnalysisService:
     def __init__(self, api_key: str):
         """Initialize the audio analysis service with Gemini API key"""
         self.api_key = api_key
-        genai.configure(api_key=api_key)
+        # Shared process-wide so the SDK's gRPC channel isn't rebuilt per service
+        Config.configure_genai(api_key)
         
         # Initialize the Gemini model
         self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
@@ -37,11 +54,12 @@ class AudioAnalysisService:
         try:
             print(f"[AUDIO] Starting analysis of audio: {filename}")
             
-            # Validate file exists and get info
-            if not os.path.exists(audio_path):
+            # Validate file exists and get info with a single stat call
+            try:
+                file_size = os.stat(audio_path).st_size
+            except FileNotFoundError:
                 raise FileNotFoundError(f"Audio file not found: {audio_path}")
             
-            file_size = os.path.getsize(audio_path)
             file_size_mb = file_size / (1024 * 1024)
             
             print(f"[AUDIO] Audio file size: {file_size_mb:.2f} MB")
@@ -55,14 +73,7 @@ class AudioAnalysisService:
             if not mime_type or not mime_type.startswith('audio/'):
                 # Try to infer from extension
                 ext = os.path.splitext(audio_path)[1].lower()
-                mime_map = {
-                    '.mp3': 'audio/mpeg',
-                    '.wav': 'audio/wav',
-                    '.m4a': 'audio/mp4',
-                    '.aac': 'audio/aac',
-                    '.flac': 'audio/flac'
-                }
-                mime_type = mime_map.get(ext, 'audio/mpeg')
+                mime_type = _AUDIO_MIME_TYPES.get(ext, 'audio/mpeg')
             
             print(f"[AUDIO] Detected MIME type: {mime_type}")
             
@@ -17,14 +17,16 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.settings import Config
 
+logger = logging.getLogger(__name__)
+
 # Import Google Cloud Natural Language API - with proper error handling for import
 try:
     from google.cloud import language_v1
     HAS_GOOGLE_LANGUAGE = True
-    logging.info("Successfully imported Google Cloud Language API")
+    logger.info("Successfully imported Google Cloud Language API")
 except ImportError:
     HAS_GOOGLE_LANGUAGE = False
-    logging.warning("Google Cloud Language API not available. Using keyword-based classification only.")
+    logger.warning("Google Cloud Language API not available. Using keyword-based classification only.")
 
 # Document categories for KMRL
 DOCUMENT_CATEGORIES = [
@@ -167,14 +169,14 @@ class ClassificationService:
                 credentials = Config.get_credentials()
                 self.language_client = language_v1.LanguageServiceClient(credentials=credentials)
                 self.use_google_api = True
-                print("[CLASS] Google Cloud Natural Language API client initialized successfully")
-                print(f"[CLASS] Using project: {Config.PROJECT_ID}")
+                logger.info("[CLASS] Google Cloud Natural Language API client initialized successfully")
+                logger.info("[CLASS] Using project: %s", Config.PROJECT_ID)
             except Exception as e:
                 self.use_google_api = False
-                print(f"[CLASS] ❌ Failed to initialize Google Cloud Natural Language API: {e}")
-                print("[CLASS] Falling back to keyword-based classification")
+                logger.error("[CLASS] ❌ Failed to initialize Google Cloud Natural Language API: %s", e)
+                logger.warning("[CLASS] Falling back to keyword-based classification")
         else:
-            print("[CLASS] Google Cloud Language API not available. Using keyword-based classification only.")
+            logger.warning("[CLASS] Google Cloud Language API not available. Using keyword-based classification only.")
     
     def _find_best_kmrl_category(self, google_categories: List[Dict]) -> Tuple[str, float]:
         """
@@ -241,7 +243,7 @@ class ClassificationService:
             Classification results dictionary
         """
         if not HAS_GOOGLE_LANGUAGE:
-            print("[CLASS] Google Cloud Language API not available")
+            logger.warning("[CLASS] Google Cloud Language API not available")
             return None
             
         try:
@@ -250,22 +252,22 @@ class ClassificationService:
                 content=text,
                 type_=language_v1.Document.Type.PLAIN_TEXT
             )
-            print(f"[CLASS] Created document for classification, text length: {len(text)}")
+            logger.debug("[CLASS] Created document for classification, text length: %d", len(text))
             
             # Use content classification from Natural Language API
             try:
-                print("[CLASS] Calling Google Natural Language API classify_text...")
+                logger.debug("[CLASS] Calling Google Natural Language API classify_text...")
                 response = self.language_client.classify_text(document=document)
-                print("[CLASS] Google Cloud Natural Language API classification successful!")
+                logger.debug("[CLASS] Google Cloud Natural Language API classification successful!")
             except Exception as e:
-                logging.error(f"Google API classification failed: {e}")
+                logger.error("Google API classification failed: %s", e)
                 # If this is a SERVICE_DISABLED error, provide more specific guidance
                 if "SERVICE_DISABLED" in str(e) and "data-axle-firebase" in str(e):
-                    logging.error("Please enable the Natural Language API in the Google Cloud Console for project 'data-axle-firebase'")
-                    logging.error("Visit: https://console.cloud.google.com/apis/library/language.googleapis.com?project=data-axle-firebase")
+                    logger.error("Please enable the Natural Language API in the Google Cloud Console for project 'data-axle-firebase'")
+                    logger.error("Visit: https://console.cloud.google.com/apis/library/language.googleapis.com?project=data-axle-firebase")
                 return None
         except Exception as e:
-            logging.error(f"Error preparing document for classification: {e}")
+            logger.error("Error preparing document for classification: %s", e)
             return None
             
         # Process Google's classification results
@@ -412,7 +414,7 @@ class ClassificationService:
                     google_results["processing_time_seconds"] = time.time() - start_time
                     return google_results
             except Exception as e:
-                logging.error(f"Error using Google Cloud Natural Language API: {e}")
+                logger.error("Error using Google Cloud Natural Language API: %s", e)
                 # Fall back to keyword-based classification
         
         # Fallback to keyword-based classification
@@ -4,14 +4,79 @@ Handles different document types (PDF, DOC/DOCX, Images) with appropriate extrac
 """
 
 import io
-from typing import Dict, Any, Optional
+import os
+import asyncio
+import hashlib
+import tempfile
+import threading
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, BinaryIO, Iterator, Tuple, Union
 import PyPDF2
 from docx import Document
+from lxml import etree
 
-from utils.document_detector import detect_document_type
+from utils.document_detector import detect_document_type, detect_document_type_from_bytes
 from services.ocr_service import VisionService
 from services.classification_service import ClassificationService
 
+# PDFs above this page count are split across worker processes;
+# smaller ones are cheaper to parse inline than to fork workers for
+PARALLEL_PDF_PAGE_THRESHOLD = 10
+
+# Pages per process pool task; small tasks let extraction stop early on large PDFs
+# because queued ranges past the classification window are cancelled
+PDF_PAGES_PER_TASK = 10
+
+# Characters of PDF text read for classification (ClassificationService trims its
+# input to this length), so pages past this window are never extracted
+CLASSIFICATION_CHAR_BUDGET = 90000
+
+# Number of extracted document texts kept in memory, keyed by content hash
+TEXT_CACHE_MAX_ENTRIES = 128
+
+# WordprocessingML elements read when streaming DOCX body XML
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_TEXT = _W_NS + "t"
+_W_TAB = _W_NS + "tab"
+_W_BREAK = _W_NS + "br"
+_W_PARAGRAPH = _W_NS + "p"
+_W_CELL = _W_NS + "tc"
+_W_ROW = _W_NS + "tr"
+_W_TABLE = _W_NS + "tbl"
+_DOCX_STREAM_TAGS = (_W_TEXT, _W_TAB, _W_BREAK, _W_PARAGRAPH, _W_CELL, _W_ROW, _W_TABLE)
+
+
+# Process pool for large PDFs, created on first use and shared by all requests
+_pdf_executor: Optional[ProcessPoolExecutor] = None
+_pdf_executor_lock = threading.Lock()
+
+def _get_pdf_executor() -> ProcessPoolExecutor:
+    """Return the shared PDF extraction process pool, starting it on first use"""
+    global _pdf_executor
+    with _pdf_executor_lock:
+        if _pdf_executor is None:
+            _pdf_executor = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+        return _pdf_executor
+
+def _extract_pdf_page_range(pdf_path: str, start: int, end: int) -> List[str]:
+    """
+    Extract text from pages [start, end) of a PDF (process pool worker)
+    
+    Args:
+        pdf_path: Path of the PDF file (workers read it from disk rather than
+            receiving the whole file through the pool's pipe)
+        start: First page index (inclusive)
+        end: Last page index (exclusive)
+        
+    Returns:
+        List of page text strings in page order
+    """
+    with open(pdf_path, "rb") as pdf_file:
+        pdf_reader = PyPDF2.PdfReader(pdf_file)
+        return [pdf_reader.pages[i].extract_text() or "" for i in range(start, end)]
+
 class DocumentProcessor:
     """
     Unified document processing service that handles multiple document types
@@ -22,6 +87,10 @@ class DocumentProcessor:
         print("[DOC-PROCESSOR] Initializing document processor service...")
         self.vision_service = VisionService()
         self.classification_service = ClassificationService()
+        
+        # LRU cache of extracted text so re-uploaded documents skip parsing
+        self._text_cache: "OrderedDict[tuple, Union[str, Tuple[str, int, int]]]" = OrderedDict()
+        self._text_cache_lock = threading.Lock()
         print("[DOC-PROCESSOR] ✅ Document processor service ready")
         
     async def process_document(self, file_bytes: bytes, filename: str) -> Dict[str, Any]:
@@ -35,20 +104,27 @@ class DocumentProcessor:
         Returns:
             Dict with processing results including document type, extracted text, and classification
         """
-        # Detect document type
-        doc_type = detect_document_type(filename)
+        # Detect document type from content first so mis-named files are routed
+        # correctly (e.g. a PDF uploaded as .jpg must not go through OCR);
+        # the extension is only a fallback for formats without a known signature
+        doc_type = detect_document_type_from_bytes(file_bytes, filename)
+        if doc_type == "unknown":
+            doc_type = detect_document_type(filename)
         print(f"[DOC-PROCESSOR] Detected document type: {doc_type} for file {filename}")
         
-        # Extract text based on document type
+        # Extract text based on document type; parsing and OCR are blocking,
+        # so run them in a worker thread to keep the event loop responsive
+        page_info = {}
         if doc_type == "pdf":
-            text = self._extract_pdf_text(file_bytes)
-            print(f"[DOC-PROCESSOR] Extracted {len(text)} characters from PDF")
+            text, pages_extracted, page_count = await asyncio.to_thread(self._extract_pdf_text, file_bytes)
+            page_info = {"page_count": page_count, "pages_extracted": pages_extracted}
+            print(f"[DOC-PROCESSOR] Extracted {len(text)} characters from {pages_extracted} of {page_count} PDF pages")
         elif doc_type in ["doc", "docx"]:
-            text = self._extract_doc_text(file_bytes, doc_type)
+            text = await asyncio.to_thread(self._extract_doc_text, file_bytes, doc_type)
             print(f"[DOC-PROCESSOR] Extracted {len(text)} characters from {doc_type.upper()}")
         elif doc_type == "image":
             # Use existing OCR pipeline
-            ocr_result = self.vision_service.extract_text(file_bytes)
+            ocr_result = await asyncio.to_thread(self.vision_service.extract_text, file_bytes)
             text = ocr_result.text
             print(f"[DOC-PROCESSOR] Extracted {len(text)} characters from image using OCR")
         else:
@@ -59,7 +135,7 @@ class DocumentProcessor:
                 "doc_type": doc_type
             }
         
-        if not text or len(text.strip()) == 0:
+        if not text or text.isspace():
             print(f"[DOC-PROCESSOR] ⚠️ No text extracted from {doc_type} document")
             return {
                 "success": False,
@@ -84,34 +160,124 @@ class DocumentProcessor:
             "doc_type": doc_type,
             "text": text[:1000] + "..." if len(text) > 1000 else text,  # Truncate preview for response
             "text_length": len(text),
+            **page_info,
             "classification": classification
         }
     
-    def _extract_pdf_text(self, file_bytes: bytes) -> str:
+    def _extract_pdf_text(self, file_bytes: bytes) -> Tuple[str, int, int]:
         """
-        Extract text from PDF file
+        Extract the classification window of a PDF's text
+        
+        Pages are produced lazily and extraction stops once CLASSIFICATION_CHAR_BUDGET
+        characters have been read, so large PDFs never hold text that is not classified.
         
         Args:
             file_bytes: Raw bytes of PDF file
             
         Returns:
-            Extracted text string
+            Tuple of (extracted text, pages extracted, total page count)
         """
-        pdf_text = ""
+        cache_key = self._text_cache_key(file_bytes, "pdf")
+        cached_result = self._get_cached_text(cache_key)
+        if cached_result is not None:
+            print("[DOC-PROCESSOR] Using cached PDF text")
+            return cached_result
+        
         try:
-            with io.BytesIO(file_bytes) as pdf_file:
-                pdf_reader = PyPDF2.PdfReader(pdf_file)
-                print(f"[DOC-PROCESSOR] PDF has {len(pdf_reader.pages)} pages")
-                
-                for page_num in range(len(pdf_reader.pages)):
-                    page_text = pdf_reader.pages[page_num].extract_text() or ""
-                    pdf_text += page_text + "\n\n"
-                    
-            return pdf_text
+            # PyPDF2 needs a seekable stream; BytesIO wraps the upload without copying
+            pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_bytes))
+            page_count = len(pdf_reader.pages)
+            print(f"[DOC-PROCESSOR] PDF has {page_count} pages")
+            
+            workers = min(os.cpu_count() or 1, page_count)
+            
+            if page_count > PARALLEL_PDF_PAGE_THRESHOLD and workers > 1:
+                pages = self._iter_pdf_pages_parallel(file_bytes, page_count)
+            else:
+                pages = self._iter_pdf_pages(pdf_reader)
+            
+            try:
+                pdf_text, pages_extracted = self._read_classification_window(pages)
+            finally:
+                pages.close()
+            
+            if pages_extracted < page_count:
+                print(f"[DOC-PROCESSOR] Stopped after {pages_extracted} of {page_count} pages "
+                      f"({CLASSIFICATION_CHAR_BUDGET} char budget)")
+            result = (pdf_text, pages_extracted, page_count)
+            self._store_cached_text(cache_key, result)
+            return result
         except Exception as e:
-            error_msg = f"PDF extraction error: {str(e)}"
+            error_msg = f"PDF extraction error ({len(file_bytes)} bytes): {str(e)}"
             print(f"[DOC-PROCESSOR] ❌ {error_msg}")
-            return f"Error extracting PDF text: {str(e)}"
+            return f"Error extracting PDF text: {str(e)}", 0, 0
+    
+    @staticmethod
+    def _read_classification_window(pages: Iterator[str]) -> Tuple[str, int]:
+        """
+        Join pages until CLASSIFICATION_CHAR_BUDGET characters are filled
+        
+        Args:
+            pages: Page text strings in page order
+            
+        Returns:
+            Tuple of (joined text, at most CLASSIFICATION_CHAR_BUDGET long; pages consumed)
+        """
+        parts = []
+        remaining = CLASSIFICATION_CHAR_BUDGET
+        for page_text in pages:
+            if parts:
+                page_text = "\n\n" + page_text
+            parts.append(page_text[:remaining])
+            remaining -= len(parts[-1])
+            if remaining <= 0:
+                break
+        return "".join(parts), len(parts)
+    
+    @staticmethod
+    def _iter_pdf_pages(pdf_reader: PyPDF2.PdfReader) -> Iterator[str]:
+        """
+        Yield the text of each PDF page in order, extracting on demand
+        
+        Args:
+            pdf_reader: Open PyPDF2 reader
+            
+        Yields:
+            Page text strings
+        """
+        for page in pdf_reader.pages:
+            yield page.extract_text() or ""
+    
+    def _iter_pdf_pages_parallel(self, file_bytes: bytes, page_count: int) -> Iterator[str]:
+        """
+        Yield PDF page text in order, extracted by the process pool in PDF_PAGES_PER_TASK ranges
+        
+        Closing the generator early cancels the ranges that have not started yet.
+        
+        Args:
+            file_bytes: Raw bytes of PDF file
+            page_count: Total number of pages in the PDF
+            
+        Yields:
+            Page text strings
+        """
+        ranges = [(start, min(start + PDF_PAGES_PER_TASK, page_count))
+                  for start in range(0, page_count, PDF_PAGES_PER_TASK)]
+        print(f"[DOC-PROCESSOR] Extracting {page_count} pages in {len(ranges)} parallel tasks")
+        
+        # The PDF is written to disk once and each worker opens it by path
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as pdf_file:
+            pdf_file.write(file_bytes)
+        executor = _get_pdf_executor()
+        futures = [executor.submit(_extract_pdf_page_range, pdf_file.name, start, end)
+                   for start, end in ranges]
+        try:
+            for future in futures:
+                yield from future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+            os.unlink(pdf_file.name)
     
     def _extract_doc_text(self, file_bytes: bytes, doc_type: str) -> str:
         """
@@ -124,25 +290,125 @@ class DocumentProcessor:
         Returns:
             Extracted text string
         """
+        cache_key = self._text_cache_key(file_bytes, doc_type)
+        cached_text = self._get_cached_text(cache_key)
+        if cached_text is not None:
+            print(f"[DOC-PROCESSOR] Using cached {doc_type.upper()} text")
+            return cached_text
+        
+        # One stream shared by the streaming parser and the python-docx fallback
+        doc_file = io.BytesIO(file_bytes)
+        
         try:
-            doc_text = ""
-            with io.BytesIO(file_bytes) as doc_file:
-                doc = Document(doc_file)
-                print(f"[DOC-PROCESSOR] Document has {len(doc.paragraphs)} paragraphs")
+            doc_text = self._stream_docx_text(doc_file)
+            self._store_cached_text(cache_key, doc_text)
+            return doc_text
+        except Exception as e:
+            print(f"[DOC-PROCESSOR] ⚠️ Streaming {doc_type.upper()} parse failed ({str(e)}), using python-docx")
+        
+        try:
+            doc_file.seek(0)
+            doc = Document(doc_file)
+            print(f"[DOC-PROCESSOR] Document has {len(doc.paragraphs)} paragraphs")
+            
+            parts = [para.text for para in doc.paragraphs]
                 
-                for para in doc.paragraphs:
-                    doc_text += para.text + "\n"
-                    
-                # Extract text from tables if present
-                for table in doc.tables:
-                    for row in table.rows:
-                        for cell in row.cells:
-                            doc_text += cell.text + " | "
-                        doc_text += "\n"
-                    doc_text += "\n"
+            # Extract text from tables if present, one line per row
+            for table in doc.tables:
+                for row in table.rows:
+                    parts.append(" | ".join(cell.text for cell in row.cells))
+                parts.append("")
                     
+            doc_text = "\n".join(parts)
+            self._store_cached_text(cache_key, doc_text)
             return doc_text
         except Exception as e:
-            error_msg = f"{doc_type.upper()} extraction error: {str(e)}"
+            error_msg = f"{doc_type.upper()} extraction error ({len(file_bytes)} bytes): {str(e)}"
             print(f"[DOC-PROCESSOR] ❌ {error_msg}")
-            return f"Error extracting {doc_type.upper()} text: {str(e)}"
\ No newline at end of file
+            return f"Error extracting {doc_type.upper()} text: {str(e)}"
+    
+    def _stream_docx_text(self, doc_file: BinaryIO) -> str:
+        """
+        Extract DOCX text by streaming word/document.xml instead of building python-docx objects
+        
+        Paragraphs become lines and each table row becomes one line with cells joined
+        by " | ", matching the python-docx based output. Elements are cleared as soon
+        as they are consumed so memory stays flat for large documents.
+        
+        Args:
+            doc_file: Binary stream over the DOCX file
+            
+        Returns:
+            Extracted text string
+        """
+        lines = []
+        runs = []  # run text of each open paragraph (paragraphs can nest via text boxes)
+        cells = []  # paragraph text of each open table cell
+        rows = []  # cell text of each open table row
+        
+        with zipfile.ZipFile(doc_file) as archive:
+            with archive.open("word/document.xml") as xml_file:
+                for event, elem in etree.iterparse(xml_file, events=("start", "end"), tag=_DOCX_STREAM_TAGS):
+                    tag = elem.tag
+                    
+                    if event == "start":
+                        if tag == _W_PARAGRAPH:
+                            runs.append([])
+                        elif tag == _W_CELL:
+                            cells.append([])
+                        elif tag == _W_ROW:
+                            rows.append([])
+                        continue
+                    
+                    if tag == _W_TEXT:
+                        if runs:
+                            runs[-1].append(elem.text or "")
+                    elif tag == _W_TAB:
+                        if runs:
+                            runs[-1].append("\t")
+                    elif tag == _W_BREAK:
+                        if runs:
+                            runs[-1].append("\n")
+                    elif tag == _W_PARAGRAPH:
+                        paragraph = "".join(runs.pop())
+                        if cells:
+                            cells[-1].append(paragraph)
+                        else:
+                            lines.append(paragraph)
+                    elif tag == _W_CELL:
+                        rows[-1].append("\n".join(cells.pop()))
+                    elif tag == _W_ROW:
+                        row = " | ".join(rows.pop())
+                        if cells:
+                            cells[-1].append(row)
+                        else:
+                            lines.append(row)
+                    elif tag == _W_TABLE and not cells:
+                        lines.append("")
+                    
+                    if tag in (_W_PARAGRAPH, _W_TABLE):
+                        elem.clear()
+        
+        print(f"[DOC-PROCESSOR] Streamed {len(lines)} lines from DOCX")
+        return "\n".join(lines)
+    
+    @staticmethod
+    def _text_cache_key(file_bytes: bytes, doc_type: str) -> tuple:
+        """Build the text cache key from the document type and a content hash"""
+        return (doc_type, hashlib.blake2b(file_bytes, digest_size=16).digest())
+    
+    def _get_cached_text(self, cache_key: tuple) -> Optional[Union[str, Tuple[str, int, int]]]:
+        """Return previously extracted text (or PDF extraction result) for this key, or None"""
+        with self._text_cache_lock:
+            text = self._text_cache.get(cache_key)
+            if text is not None:
+                self._text_cache.move_to_end(cache_key)
+            return text
+    
+    def _store_cached_text(self, cache_key: tuple, text: Union[str, Tuple[str, int, int]]):
+        """Store extracted text, evicting the least recently used entry when full"""
+        with self._text_cache_lock:
+            self._text_cache[cache_key] = text
+            self._text_cache.move_to_end(cache_key)
+            if len(self._text_cache) > TEXT_CACHE_MAX_ENTRIES:
+                self._text_cache.popitem(last=False)
@@ -5,6 +5,8 @@ import os
 import sys
 import re
 import time
+import asyncio
+import logging
 from typing import List, Dict, Any, Optional, Union
 from pydantic import BaseModel
 from datetime import datetime
@@ -16,6 +18,34 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.settings import Config
 
+logger = logging.getLogger(__name__)
+
+# Prefer RE2 for key-value extraction when installed - it guarantees linear-time
+# matching on large or noisy OCR text; fall back to Python's backtracking re otherwise
+try:
+    import re2
+    HAS_RE2 = True
+except ImportError:
+    re2 = None
+    HAS_RE2 = False
+
+# Natural Language API enums resolved once at import rather than per entity/mention
+_PLAIN_TEXT = language_v1.Document.Type.PLAIN_TEXT
+_UTF8 = language_v1.EncodingType.UTF8
+_ENTITY_TYPE_NAMES = {member.value: member.name for member in language_v1.Entity.Type}
+_MENTION_TYPE_NAMES = {member.value: member.name for member in language_v1.EntityMention.Type}
+
+# Key-value line pattern ("Key: Value", "Key - Value", "Key=Value").
+# Kept free of lookarounds so it compiles under both RE2 and re.
+KV_PATTERN = r'([A-Za-z][A-Za-z\s]*?)\s*[:=\-]\s*(.+)'
+
+# Longer "keys" are sentences that happen to contain a separator, not field names
+MAX_KEY_LENGTH = 50
+
+def _text_preview(text: str, limit: int = 100) -> str:
+    """Short preview of the analyzed text for result payloads and logs"""
+    return text if len(text) <= limit else text[:limit] + "..."
+
 class EntityResult(BaseModel):
     """Entity extraction result from a document"""
     name: str
@@ -85,16 +115,93 @@ class FormExtractionResult(BaseModel):
     confidence: float
     error: Optional[str] = None
 
+# Mock table cells for the demo table extraction:
+# (row_idx, col_idx, text, confidence, x, y, width, height)
+_MOCK_TABLE_1_CELLS = (
+    (0, 0, "Item", 0.98, 10, 10, 100, 30),
+    (0, 1, "Quantity", 0.99, 120, 10, 100, 30),
+    (0, 2, "Price", 0.97, 230, 10, 100, 30),
+    (1, 0, "Desk Lamp", 0.95, 10, 50, 100, 30),
+    (1, 1, "2", 0.99, 120, 50, 100, 30),
+    (1, 2, "₹1200", 0.96, 230, 50, 100, 30),
+    (2, 0, "Office Chair", 0.94, 10, 90, 100, 30),
+    (2, 1, "1", 0.99, 120, 90, 100, 30),
+    (2, 2, "₹5500", 0.97, 230, 90, 100, 30),
+)
+
+_MOCK_TABLE_2_CELLS = (
+    (0, 0, "Date", 0.98, 10, 150, 100, 30),
+    (0, 1, "Reference", 0.97, 120, 150, 100, 30),
+    (1, 0, "2023-05-12", 0.96, 10, 190, 100, 30),
+    (1, 1, "INV-2023-0542", 0.95, 120, 190, 100, 30),
+)
+
+# Mock form fields for the demo form extraction, keyed by form type:
+# (name, value, confidence, type, x, y, width, height)
+_MOCK_FORM_FIELDS = {
+    "invoice": (
+        ("Invoice Number", "INV-2023-0542", 0.97, "text", 400, 50, 150, 30),
+        ("Date", "2023-05-12", 0.95, "date", 400, 90, 150, 30),
+        ("Customer", "KMRL Metro Operations", 0.93, "text", 100, 150, 300, 30),
+        ("Total Amount", "₹6700", 0.96, "amount", 400, 400, 150, 30),
+    ),
+    "purchase_order": (
+        ("PO Number", "PO-2023-1087", 0.98, "text", 400, 50, 150, 30),
+        ("Date", "2023-05-10", 0.96, "date", 400, 90, 150, 30),
+        ("Vendor", "Office Supplies Ltd", 0.94, "text", 100, 150, 300, 30),
+        ("Delivery Date", "2023-05-20", 0.92, "date", 400, 150, 150, 30),
+        ("Total Amount", "₹6700", 0.95, "amount", 400, 400, 150, 30),
+    ),
+    "generic": (
+        ("Name", "John Smith", 0.96, "text", 200, 100, 300, 30),
+        ("Date", "2023-05-15", 0.97, "date", 200, 150, 150, 30),
+        ("Address", "123 Main St, Kochi", 0.92, "text", 200, 200, 300, 60),
+        ("Phone", "+91-9876543210", 0.95, "phone", 200, 270, 200, 30),
+        ("Signature", "[Signature detected]", 0.85, "signature", 200, 400, 200, 60),
+    ),
+}
+
+
+def _mock_cells(rows) -> List[TableCell]:
+    """Build TableCell models from a mock cell table without pydantic validation"""
+    return [
+        TableCell.model_construct(
+            row_idx=row_idx, col_idx=col_idx, text=text, confidence=confidence,
+            bounding_box={"x": x, "y": y, "width": width, "height": height}
+        )
+        for row_idx, col_idx, text, confidence, x, y, width, height in rows
+    ]
+
 class EntityExtractionService:
     """Service to extract structured data from documents"""
     
+    # Single pass over "Key: Value", "Key - Value" and "Key=Value" lines.
+    _KV_RE = re2.compile(KV_PATTERN) if HAS_RE2 else re.compile(KV_PATTERN)
+    
     def __init__(self):
         """Initialize extraction services"""
-        print("[EXTRACT] Initializing Google Cloud Natural Language client for entity extraction...")
+        logger.info("[EXTRACT] Initializing Google Cloud Natural Language client for entity extraction...")
         from config.settings import Config
         credentials = Config.get_credentials()
+        self._credentials = credentials
         self.nlp_client = language_v1.LanguageServiceClient(credentials=credentials)
-        print("[EXTRACT] ✅ Entity extraction service ready")
+        # Async client is created on first batch call so it binds to the running event loop
+        self.async_nlp_client = None
+        logger.info("[EXTRACT] ✅ Entity extraction service ready")
+    
+    def _to_entity_result(self, entity) -> EntityResult:
+        """Convert a Natural Language API entity into an EntityResult"""
+        return EntityResult(
+            name=entity.name,
+            type=_ENTITY_TYPE_NAMES.get(entity.type_, "UNKNOWN"),
+            salience=entity.salience,
+            mentions=[{
+                "text": mention.text.content,
+                "type": _MENTION_TYPE_NAMES.get(mention.type_, "TYPE_UNKNOWN"),
+                "begin_offset": mention.text.begin_offset
+            } for mention in entity.mentions],
+            metadata={key: value for key, value in entity.metadata.items()}
+        )
     
     def extract_entities(self, text: str, language: str = "en") -> EntityExtractionResult:
         """
@@ -107,59 +214,107 @@ class EntityExtractionService:
         Returns:
             EntityExtractionResult with extracted entities
         """
-        print(f"[EXTRACT] Analyzing entities in text ({len(text)} chars, language: {language})")
+        logger.debug("[EXTRACT] Analyzing entities in text (%d chars, language: %s)", len(text), language)
+        preview = _text_preview(text)
         
         try:
             # Create document for analysis
             document = language_v1.Document(
                 content=text,
                 language=language,
-                type_=language_v1.Document.Type.PLAIN_TEXT
+                type_=_PLAIN_TEXT
             )
             
             # Detect entities
             start_time = time.time()
             entity_response = self.nlp_client.analyze_entities(
                 document=document,
-                encoding_type=language_v1.EncodingType.UTF8
+                encoding_type=_UTF8
             )
             processing_time = time.time() - start_time
             
             # Convert entities to result format
-            entities = []
-            for entity in entity_response.entities:
-                entity_data = EntityResult(
-                    name=entity.name,
-                    type=language_v1.Entity.Type(entity.type_).name,
-                    salience=entity.salience,
-                    mentions=[{
-                        "text": mention.text.content,
-                        "type": language_v1.EntityMention.Type(mention.type_).name,
-                        "begin_offset": mention.text.begin_offset
-                    } for mention in entity.mentions],
-                    metadata={key: value for key, value in entity.metadata.items()}
-                )
-                entities.append(entity_data)
+            entities = [self._to_entity_result(entity) for entity in entity_response.entities]
             
-            print(f"[EXTRACT] ✅ Extracted {len(entities)} entities in {processing_time:.2f}s")
+            logger.info("[EXTRACT] ✅ Extracted %d entities in %.2fs", len(entities), processing_time)
             
             return EntityExtractionResult(
                 entities=entities,
                 language=language,
-                text=text[:100] + "..." if len(text) > 100 else text  # Truncate for logs
+                text=preview
             )
             
         except Exception as e:
             error_msg = f"Entity extraction failed: {str(e)}"
-            print(f"[EXTRACT] ❌ {error_msg}")
+            logger.error("[EXTRACT] ❌ %s", error_msg)
             
             return EntityExtractionResult(
                 entities=[],
                 language=language,
-                text=text[:100] + "..." if len(text) > 100 else text,
+                text=preview,
                 error=error_msg
             )
     
+    async def extract_entities_batch(self, texts: List[str], language: str = "en") -> List[EntityExtractionResult]:
+        """
+        Extract entities from many texts concurrently using the async NL API client
+        
+        Args:
+            texts: The texts to analyze
+            language: Language code (en, ml)
+            
+        Returns:
+            List of EntityExtractionResult, one per input text in the same order
+        """
+        logger.debug("[EXTRACT] Analyzing entities in batch of %d texts (language: %s)", len(texts), language)
+        
+        if self.async_nlp_client is None:
+            self.async_nlp_client = language_v1.LanguageServiceAsyncClient(credentials=self._credentials)
+        
+        documents = [
+            language_v1.Document(
+                content=text,
+                language=language,
+                type_=_PLAIN_TEXT
+            )
+            for text in texts
+        ]
+        
+        start_time = time.time()
+        responses = await asyncio.gather(
+            *[self.async_nlp_client.analyze_entities(
+                document=document,
+                encoding_type=_UTF8
+            ) for document in documents],
+            return_exceptions=True
+        )
+        processing_time = time.time() - start_time
+        
+        results = []
+        for text, response in zip(texts, responses):
+            preview = _text_preview(text)
+            
+            # Keep failures isolated to the text that caused them
+            if isinstance(response, Exception):
+                results.append(EntityExtractionResult(
+                    entities=[],
+                    language=language,
+                    text=preview,
+                    error=f"Entity extraction failed: {str(response)}"
+                ))
+                continue
+            
+            results.append(EntityExtractionResult(
+                entities=[self._to_entity_result(entity) for entity in response.entities],
+                language=language,
+                text=preview
+            ))
+        
+        successful = sum(1 for r in results if not r.error)
+        logger.info("[EXTRACT] ✅ Batch entity extraction completed: %d/%d successful in %.2fs", successful, len(texts), processing_time)
+        
+        return results
+    
     def extract_key_value_pairs(self, text: str, language: str = "en") -> KeyValueExtractionResult:
         """
         Extract key-value pairs from text using regex and NLP
@@ -171,61 +326,54 @@ class EntityExtractionService:
         Returns:
             KeyValueExtractionResult with extracted pairs
         """
-        print(f"[EXTRACT] Extracting key-value pairs from text ({len(text)} chars)")
+        logger.debug("[EXTRACT] Extracting key-value pairs from text (%d chars)", len(text))
+        preview = _text_preview(text)
         
         try:
             # Simple regex-based extraction for demo purposes
             # In production, would use DocumentAI or more advanced techniques
             
-            # Pattern for "Key: Value" or "Key - Value"
-            kv_patterns = [
-                r'([A-Za-z\s]+?):\s*(.+?)(?=\n|$)',  # Key: Value
-                r'([A-Za-z\s]+?)\s*-\s*(.+?)(?=\n|$)',  # Key - Value
-                r'([A-Za-z\s]+?)=\s*(.+?)(?=\n|$)',  # Key=Value
-            ]
-            
             pairs = []
             
-            for pattern in kv_patterns:
-                matches = re.finditer(pattern, text)
+            for match in self._KV_RE.finditer(text):
+                # Keys start with a letter and the lazy match never ends them on
+                # whitespace, so only the value needs stripping
+                key = match.group(1)
+                value = match.group(2).strip()
                 
-                for match in matches:
-                    key = match.group(1).strip()
-                    value = match.group(2).strip()
-                    
-                    # Skip if key or value is too short
-                    if len(key) < 2 or len(value) < 1:
-                        continue
-                    
-                    # Skip if key is too long (likely not a key)
-                    if len(key) > 50:
-                        continue
-                    
-                    # Add to results
-                    pairs.append(KeyValuePair(
-                        key=key,
-                        value=value,
-                        confidence=0.85,  # Mock confidence since this is regex-based
-                        bounding_box=None  # No bounding box for text-based extraction
-                    ))
+                # Skip if key or value is too short
+                if len(key) < 2 or not value:
+                    continue
+                
+                # Skip if key is too long (likely not a key)
+                if len(key) > MAX_KEY_LENGTH:
+                    continue
+                
+                # Add to results - fields are regex-produced strings, so skip re-validation
+                pairs.append(KeyValuePair.model_construct(
+                    key=key,
+                    value=value,
+                    confidence=0.85,  # Mock confidence since this is regex-based
+                    bounding_box=None  # No bounding box for text-based extraction
+                ))
             
-            print(f"[EXTRACT] ✅ Extracted {len(pairs)} key-value pairs")
+            logger.info("[EXTRACT] ✅ Extracted %d key-value pairs", len(pairs))
             
             return KeyValueExtractionResult(
                 pairs=pairs,
                 language=language,
-                text=text[:100] + "..." if len(text) > 100 else text,
+                text=preview,
                 error=None
             )
             
         except Exception as e:
             error_msg = f"Key-value extraction failed: {str(e)}"
-            print(f"[EXTRACT] ❌ {error_msg}")
+            logger.error("[EXTRACT] ❌ %s", error_msg)
             
             return KeyValueExtractionResult(
                 pairs=[],
                 language=language,
-                text=text[:100] + "..." if len(text) > 100 else text,
+                text=preview,
                 error=error_msg
             )
     
@@ -239,65 +387,32 @@ class EntityExtractionService:
         Returns:
             TableExtractionResult with extracted tables
         """
-        print(f"[EXTRACT] Table extraction requested (image size: {len(image_data)} bytes)")
+        logger.debug("[EXTRACT] Table extraction requested (image size: %d bytes)", len(image_data))
         
         try:
             # TODO: Implement real table extraction with Document AI or similar
             # For demo, return mock table extraction results
             
-            # Create mock table 1
-            cells_1 = [
-                TableCell(row_idx=0, col_idx=0, text="Item", confidence=0.98, 
-                         bounding_box={"x": 10, "y": 10, "width": 100, "height": 30}),
-                TableCell(row_idx=0, col_idx=1, text="Quantity", confidence=0.99,
-                         bounding_box={"x": 120, "y": 10, "width": 100, "height": 30}),
-                TableCell(row_idx=0, col_idx=2, text="Price", confidence=0.97,
-                         bounding_box={"x": 230, "y": 10, "width": 100, "height": 30}),
-                TableCell(row_idx=1, col_idx=0, text="Desk Lamp", confidence=0.95,
-                         bounding_box={"x": 10, "y": 50, "width": 100, "height": 30}),
-                TableCell(row_idx=1, col_idx=1, text="2", confidence=0.99,
-                         bounding_box={"x": 120, "y": 50, "width": 100, "height": 30}),
-                TableCell(row_idx=1, col_idx=2, text="₹1200", confidence=0.96,
-                         bounding_box={"x": 230, "y": 50, "width": 100, "height": 30}),
-                TableCell(row_idx=2, col_idx=0, text="Office Chair", confidence=0.94,
-                         bounding_box={"x": 10, "y": 90, "width": 100, "height": 30}),
-                TableCell(row_idx=2, col_idx=1, text="1", confidence=0.99,
-                         bounding_box={"x": 120, "y": 90, "width": 100, "height": 30}),
-                TableCell(row_idx=2, col_idx=2, text="₹5500", confidence=0.97,
-                         bounding_box={"x": 230, "y": 90, "width": 100, "height": 30})
-            ]
-            
-            table_1 = Table(
+            # Demo data is trusted, so skip pydantic validation per cell
+            table_1 = Table.model_construct(
                 rows=3,
                 columns=3,
-                cells=cells_1,
+                cells=_mock_cells(_MOCK_TABLE_1_CELLS),
                 text="Item Quantity Price\nDesk Lamp 2 ₹1200\nOffice Chair 1 ₹5500",
                 confidence=0.95,
                 bounding_box={"x": 10, "y": 10, "width": 320, "height": 110}
             )
             
-            # Create mock table 2 
-            cells_2 = [
-                TableCell(row_idx=0, col_idx=0, text="Date", confidence=0.98,
-                         bounding_box={"x": 10, "y": 150, "width": 100, "height": 30}),
-                TableCell(row_idx=0, col_idx=1, text="Reference", confidence=0.97,
-                         bounding_box={"x": 120, "y": 150, "width": 100, "height": 30}),
-                TableCell(row_idx=1, col_idx=0, text="2023-05-12", confidence=0.96,
-                         bounding_box={"x": 10, "y": 190, "width": 100, "height": 30}),
-                TableCell(row_idx=1, col_idx=1, text="INV-2023-0542", confidence=0.95,
-                         bounding_box={"x": 120, "y": 190, "width": 100, "height": 30})
-            ]
-            
-            table_2 = Table(
+            table_2 = Table.model_construct(
                 rows=2,
                 columns=2,
-                cells=cells_2,
+                cells=_mock_cells(_MOCK_TABLE_2_CELLS),
                 text="Date Reference\n2023-05-12 INV-2023-0542",
                 confidence=0.96,
                 bounding_box={"x": 10, "y": 150, "width": 220, "height": 70}
             )
             
-            print(f"[EXTRACT] ✅ Table extraction completed (mock data for demo)")
+            logger.info("[EXTRACT] ✅ Table extraction completed (mock data for demo)")
             
             return TableExtractionResult(
                 tables=[table_1, table_2],
@@ -308,7 +423,7 @@ class EntityExtractionService:
             
         except Exception as e:
             error_msg = f"Table extraction failed: {str(e)}"
-            print(f"[EXTRACT] ❌ {error_msg}")
+            logger.error("[EXTRACT] ❌ %s", error_msg)
             
             return TableExtractionResult(
                 tables=[],
@@ -328,56 +443,23 @@ class EntityExtractionService:
         Returns:
             FormExtractionResult with extracted fields
         """
-        print(f"[EXTRACT] Form field extraction requested (image size: {len(image_data)} bytes)")
+        logger.debug("[EXTRACT] Form field extraction requested (image size: %d bytes)", len(image_data))
         
         try:
             # TODO: Implement real form field extraction with Document AI or similar
             # For demo, return mock form field extraction results
             
             # Create mock form fields based on template type
-            if form_template == "invoice":
-                fields = [
-                    FormField(name="Invoice Number", value="INV-2023-0542", confidence=0.97, type="text",
-                             bounding_box={"x": 400, "y": 50, "width": 150, "height": 30}),
-                    FormField(name="Date", value="2023-05-12", confidence=0.95, type="date",
-                             bounding_box={"x": 400, "y": 90, "width": 150, "height": 30}),
-                    FormField(name="Customer", value="KMRL Metro Operations", confidence=0.93, type="text",
-                             bounding_box={"x": 100, "y": 150, "width": 300, "height": 30}),
-                    FormField(name="Total Amount", value="₹6700", confidence=0.96, type="amount",
-                             bounding_box={"x": 400, "y": 400, "width": 150, "height": 30})
-                ]
-                form_type = "invoice"
-            elif form_template == "purchase_order":
-                fields = [
-                    FormField(name="PO Number", value="PO-2023-1087", confidence=0.98, type="text",
-                             bounding_box={"x": 400, "y": 50, "width": 150, "height": 30}),
-                    FormField(name="Date", value="2023-05-10", confidence=0.96, type="date",
-                             bounding_box={"x": 400, "y": 90, "width": 150, "height": 30}),
-                    FormField(name="Vendor", value="Office Supplies Ltd", confidence=0.94, type="text",
-                             bounding_box={"x": 100, "y": 150, "width": 300, "height": 30}),
-                    FormField(name="Delivery Date", value="2023-05-20", confidence=0.92, type="date",
-                             bounding_box={"x": 400, "y": 150, "width": 150, "height": 30}),
-                    FormField(name="Total Amount", value="₹6700", confidence=0.95, type="amount",
-                             bounding_box={"x": 400, "y": 400, "width": 150, "height": 30})
-                ]
-                form_type = "purchase_order"
-            else:
-                # Generic form fields
-                fields = [
-                    FormField(name="Name", value="John Smith", confidence=0.96, type="text",
-                             bounding_box={"x": 200, "y": 100, "width": 300, "height": 30}),
-                    FormField(name="Date", value="2023-05-15", confidence=0.97, type="date",
-                             bounding_box={"x": 200, "y": 150, "width": 150, "height": 30}),
-                    FormField(name="Address", value="123 Main St, Kochi", confidence=0.92, type="text",
-                             bounding_box={"x": 200, "y": 200, "width": 300, "height": 60}),
-                    FormField(name="Phone", value="+91-9876543210", confidence=0.95, type="phone",
-                             bounding_box={"x": 200, "y": 270, "width": 200, "height": 30}),
-                    FormField(name="Signature", value="[Signature detected]", confidence=0.85, type="signature",
-                             bounding_box={"x": 200, "y": 400, "width": 200, "height": 60})
-                ]
-                form_type = "generic"
+            form_type = form_template if form_template in _MOCK_FORM_FIELDS else "generic"
+            fields = [
+                FormField.model_construct(
+                    name=name, value=value, confidence=confidence, type=field_type,
+                    bounding_box={"x": x, "y": y, "width": width, "height": height}
+                )
+                for name, value, confidence, field_type, x, y, width, height in _MOCK_FORM_FIELDS[form_type]
+            ]
             
-            print(f"[EXTRACT] ✅ Form field extraction completed (mock data for demo)")
+            logger.info("[EXTRACT] ✅ Form field extraction completed (mock data for demo)")
             
             return FormExtractionResult(
                 fields=fields,
@@ -389,7 +471,7 @@ class EntityExtractionService:
             
         except Exception as e:
             error_msg = f"Form field extraction failed: {str(e)}"
-            print(f"[EXTRACT] ❌ {error_msg}")
+            logger.error("[EXTRACT] ❌ %s", error_msg)
             
             return FormExtractionResult(
                 fields=[],
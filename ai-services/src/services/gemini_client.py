@@ -2,9 +2,113 @@
 GeminiClient - Simple chat integration with Google's Gemini API via LangChain
 """
 
-import google.generativeai as genai
-from langchain_google_genai import ChatGoogleGenerativeAI
-from typing import List, Dict, Any, Optional
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+from langchain_core.messages import SystemMessage
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Optional, Tuple
+
+# Add parent directories to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import Config
+
+# google.generativeai and langchain_google_genai are imported on first use; they pull
+# in gRPC, protobuf and auth libraries that endpoints without chat never need
+if TYPE_CHECKING:
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+logger = logging.getLogger(__name__)
+
+# Chat models keyed by (api_key, model, temperature, max_output_tokens) so clients
+# created per request reuse the same underlying connection pool
+_CHAT_MODELS: Dict[Tuple[str, str, float, int], ChatGoogleGenerativeAI] = {}
+_GENAI_LOCK = threading.Lock()
+
+
+# Rough characters-per-token ratio used to estimate input tokens before a call
+CHARS_PER_TOKEN = 4
+
+
+class GeminiRateLimitError(Exception):
+    """Raised when a call would queue longer than Config.GEMINI_MAX_QUEUE_WAIT_SECONDS"""
+    
+    def __init__(self, retry_after: float):
+        super().__init__(f"Gemini rate limit reached, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class _AsyncTokenBucket:
+    """Token bucket that queues callers for capacity, up to a maximum wait"""
+    
+    def __init__(self, capacity: float, period: float):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self._tokens = capacity
+        self._updated = time.monotonic()
+    
+    async def acquire(self, amount: float = 1.0, max_wait: float = float("inf")) -> None:
+        """
+        Take amount tokens, waiting until they are available
+        
+        Tokens are reserved immediately (the balance may go negative), so callers are
+        served in arrival order and each one knows its wait up front.
+        
+        Raises:
+            GeminiRateLimitError: If the wait would exceed max_wait; nothing is taken
+        """
+        amount = min(amount, self.capacity)
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        wait = (amount - self._tokens) / self.rate
+        if wait > max_wait:
+            raise GeminiRateLimitError(wait)
+        self._tokens -= amount
+        if wait > 0:
+            await asyncio.sleep(wait)
+    
+    def release(self, amount: float = 1.0) -> None:
+        """Return tokens taken by acquire for a call that did not go ahead"""
+        self._tokens = min(self.capacity, self._tokens + min(amount, self.capacity))
+
+
+_request_limiter = _AsyncTokenBucket(Config.GEMINI_REQUESTS_PER_MINUTE, 60.0)
+_token_limiter = _AsyncTokenBucket(Config.GEMINI_TOKENS_PER_MINUTE, 60.0)
+
+
+@functools.lru_cache(maxsize=32)
+def _get_chat_prompt(system_prompt: str) -> ChatPromptTemplate:
+    """Prompt template for a system prompt, built once and shared by every client using it"""
+    # A message object is kept verbatim, so braces in the system prompt are not template fields
+    return ChatPromptTemplate.from_messages([SystemMessage(content=system_prompt), ("human", "{msg}")])
+
+
+def _get_chat_model(api_key: str, model: str, temperature: float, max_output_tokens: int) -> ChatGoogleGenerativeAI:
+    """Return a shared LangChain chat model for the given settings, creating it on first use"""
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    
+    key = (api_key, model, temperature, max_output_tokens)
+    with _GENAI_LOCK:
+        chat_model = _CHAT_MODELS.get(key)
+        if chat_model is None:
+            chat_model = ChatGoogleGenerativeAI(
+                model=model,
+                google_api_key=api_key,
+                temperature=temperature,
+                max_output_tokens=max_output_tokens,
+            )
+            _CHAT_MODELS[key] = chat_model
+        return chat_model
+
 
 class GeminiClient:
     """
@@ -32,27 +136,31 @@ when asked about Himanshu, say - Himanshu Lohokane is an AI & ML specialist
 
 Remember: You are the user's personal document AI assistant, not limited to any specific organization or domain."""
     
-    def __init__(self, api_key: str, system_prompt: str = None):
+    def __init__(self, api_key: str, system_prompt: Optional[str] = None):
         """Initialize the Gemini client with the provided API key"""
         self.api_key = api_key
-        genai.configure(api_key=api_key)
+        Config.configure_genai(api_key)
         
         # Use the provided system prompt or the default one
         self.system_prompt = system_prompt if system_prompt else self.DEFAULT_SYSTEM_PROMPT
         
-        # Print debug information about the system prompt
-        print(f"[GEMINI] Initializing with system prompt: {self.system_prompt[:50]}...")
+        # %.50s truncates only if the record is actually formatted
+        logger.debug("[GEMINI] Initializing with system prompt: %.50s...", self.system_prompt)
         
         # Initialize the LangChain chat model without the system parameter
         # We'll handle system messages explicitly in the chat method
-        self.chat_model = ChatGoogleGenerativeAI(
-            model="gemini-2.5-flash",
-            google_api_key=api_key,
+        self.model = "gemini-2.5-flash"
+        self.chat_model = _get_chat_model(
+            api_key,
+            model=self.model,
             temperature=0.7,
             max_output_tokens=1024,
         )
+        
+        # The system prompt is fixed per client, so the prompt | model chain is built once
+        self._chain = _get_chat_prompt(self.system_prompt) | self.chat_model
     
-    def chat(self, message: str) -> str:
+    async def chat(self, message: str) -> str:
         """
         Simple chat function that sends a message to Gemini and returns the response.
         No conversation history or context is maintained.
@@ -62,22 +170,63 @@ Remember: You are the user's personal document AI assistant, not limited to any
             
         Returns:
             The AI's response as a string
+            
+        Raises:
+            GeminiRateLimitError: If the call would queue too long for rate limit capacity
         """
         try:
-            # Log the system prompt being used
-            print(f"[CHAT] Using system prompt: {self.system_prompt[:100]}...")
+            chain = await self._prepare_chain(message)
             
-            # Create a messages array with system and user messages
-            from langchain_core.messages import SystemMessage, HumanMessage
-            
-            messages = [
-                SystemMessage(content=self.system_prompt),
-                HumanMessage(content=message)
-            ]
-            
-            # Generate a response using the LangChain chat model with explicit messages
-            response = self.chat_model.invoke(messages)
+            # Generate a response using the LangChain prompt | model chain
+            # (async so the event loop keeps serving other requests during the round-trip)
+            response = await chain.ainvoke({"msg": message})
             return response.content
+        except GeminiRateLimitError:
+            raise
         except Exception as e:
-            print(f"Error in Gemini chat: {str(e)}")
+            logger.error("Error in Gemini chat: %s", e)
             return f"Sorry, I encountered an error: {str(e)}"
+    
+    async def chat_stream(self, message: str) -> AsyncIterator[str]:
+        """
+        Streaming variant of chat that yields response text as Gemini produces it,
+        so callers can start sending output before the full completion is ready.
+        
+        Args:
+            message: The user message to send to Gemini
+            
+        Yields:
+            Chunks of the AI's response text
+            
+        Raises:
+            GeminiRateLimitError: Before the first chunk, if the call would queue too long
+        """
+        try:
+            chain = await self._prepare_chain(message)
+            async for chunk in chain.astream({"msg": message}):
+                if chunk.content:
+                    yield chunk.content
+        except GeminiRateLimitError:
+            raise
+        except Exception as e:
+            logger.error("Error in Gemini chat stream: %s", e)
+            yield f"Sorry, I encountered an error: {str(e)}"
+    
+    async def _prepare_chain(self, message: str) -> Runnable:
+        """
+        Return the chain to run for message once the rate limiters admit the call
+        
+        Returns:
+            The client's system + user prompt | model chain
+        """
+        # Wait for request and token budget so bursts queue here rather than hitting
+        # Gemini's 429s, but fail fast once the queue is longer than callers should wait
+        max_wait = Config.GEMINI_MAX_QUEUE_WAIT_SECONDS
+        await _request_limiter.acquire(max_wait=max_wait)
+        try:
+            await _token_limiter.acquire((len(self.system_prompt) + len(message)) // CHARS_PER_TOKEN,
+                                         max_wait=max_wait)
+        except GeminiRateLimitError:
+            _request_limiter.release()
+            raise
+        return self._chain
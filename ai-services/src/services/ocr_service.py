@@ -1,27 +1,426 @@
 # DataTrack KMRL - OCR Vision Service
 # Google Cloud Vision API for document text extraction
 
+from __future__ import annotations
+
 import asyncio
+import dataclasses
+import functools
+import hashlib
 import io
+import logging
 import sys
 import os
-from typing import Union, Optional, List
-from google.cloud import vision
+import random
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Union, Optional, List, Tuple
+from PIL import Image
+import pypdfium2 as pdfium
+
+if TYPE_CHECKING:
+    from google.cloud import vision
 
 # Add parent directories to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.settings import Config
-from models.ocr_models import OCRResult
+from models.ocr_models import OCRResult, DocumentAnalysis, DocumentAnnotation, DocumentFeatures
+
+logger = logging.getLogger(__name__)
+
+# Number of OCR results kept in memory, keyed by image content hash and method
+OCR_CACHE_MAX_ENTRIES = 1024
+
+# Shared across VisionService instances, which the API creates per request
+_ocr_cache: "OrderedDict[str, OCRResult]" = OrderedDict()
+_ocr_cache_lock = threading.Lock()
+
+# Decoded document_text_detection results kept in memory, keyed by image content hash;
+# annotations carry per-word columns so this is kept smaller than the OCR result cache
+ANNOTATION_CACHE_MAX_ENTRIES = 64
+
+_annotation_cache: "OrderedDict[str, DocumentAnnotation]" = OrderedDict()
+_annotation_cache_lock = threading.Lock()
+
+# Vision accepts at most 16 images per batch_annotate_images request
+VISION_BATCH_SIZE = 16
+
+# Batch requests sent concurrently by extract_text_bulk
+VISION_BULK_MAX_CONCURRENCY = 4
+
+# Vision OCRs at most 5 pages of an inline PDF per batch_annotate_files request, so PDFs
+# are split into documents of this many pages and each request carries only its own pages
+VISION_PDF_PAGES_PER_REQUEST = 5
+
+# PDFium is not thread-safe, so every PDFium call in the service (splitting, page
+# counts, rendering) runs one at a time under this lock
+_pdfium_lock = threading.Lock()
+
+# In-flight requests on the async Vision client, shared by all callers
+VISION_ASYNC_MAX_CONCURRENCY = 64
+_async_ocr_semaphore = asyncio.Semaphore(VISION_ASYNC_MAX_CONCURRENCY)
+
+# Retry policy for quota/deadline errors on the async path
+VISION_RETRY_ATTEMPTS = 5
+VISION_RETRY_INITIAL_DELAY = 0.5
+VISION_RETRY_MAX_DELAY = 8.0
+
+# Threads for blocking file reads and JPEG re-encoding on the async path, kept apart
+# from the default executor that document parsing and translation calls share
+VISION_IO_MAX_WORKERS = 32
+_ocr_io_executor = ThreadPoolExecutor(max_workers=VISION_IO_MAX_WORKERS, thread_name_prefix="ocr")
+
+
+async def _run_in_ocr_executor(func, *args):
+    """Run a blocking helper on the OCR thread pool without stalling the event loop"""
+    return await asyncio.get_running_loop().run_in_executor(_ocr_io_executor, func, *args)
+
+
+@functools.lru_cache(maxsize=None)
+def _vision_module():
+    """Import google.cloud.vision on first use; its gRPC stubs and protobuf types are slow to load"""
+    from google.cloud import vision
+    return vision
+
+
+@functools.lru_cache(maxsize=None)
+def _get_shared_vision_client() -> vision.ImageAnnotatorClient:
+    """Vision client shared by every VisionService so its gRPC channel is reused"""
+    return Config.get_vision_client()
+
+
+@functools.lru_cache(maxsize=None)
+def _get_shared_vision_async_client() -> vision.ImageAnnotatorAsyncClient:
+    """Async Vision client shared by every VisionService; created inside the event loop"""
+    return Config.get_vision_async_client()
+
+
+# Images above this size are re-encoded as JPEG before upload; Vision reads
+# quality-85 JPEG scans as well as PNG/TIFF at a fraction of the bytes
+UPLOAD_COMPRESS_THRESHOLD_BYTES = 512 * 1024
+UPLOAD_JPEG_QUALITY = 85
+_JPEG_MAGIC = b'\xff\xd8\xff'
+
+
+def _compress_for_upload(content: bytes) -> bytes:
+    """
+    Re-encode large non-JPEG images as JPEG to cut upload size
+    
+    Args:
+        content: Image bytes
+        
+    Returns:
+        JPEG bytes, or the original bytes if the image is small, already JPEG,
+        not decodable, or would not get smaller
+    """
+    if len(content) <= UPLOAD_COMPRESS_THRESHOLD_BYTES or content.startswith(_JPEG_MAGIC):
+        return content
+    
+    try:
+        with Image.open(io.BytesIO(content)) as img:
+            if img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info:
+                # JPEG has no alpha; flatten onto white so transparent backgrounds
+                # don't turn black behind dark text
+                rgba = img.convert("RGBA")
+                img = Image.alpha_composite(Image.new("RGBA", rgba.size, "white"), rgba).convert("RGB")
+            elif img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+            buffer = io.BytesIO()
+            img.save(buffer, format="JPEG", quality=UPLOAD_JPEG_QUALITY)
+    except Exception as e:
+        logger.debug("[VISION] Skipping JPEG re-encode: %s", e)
+        return content
+    
+    compressed = buffer.getvalue()
+    if len(compressed) >= len(content):
+        return content
+    logger.debug("[VISION] Re-encoded image for upload: %d -> %d bytes", len(content), len(compressed))
+    return compressed
+
+
+def _split_pdf(content: bytes, pages_per_part: int) -> List[Tuple[bytes, int]]:
+    """
+    Split a PDF into consecutive documents of at most pages_per_part pages
+    
+    Args:
+        content: PDF bytes
+        pages_per_part: Maximum pages per document
+        
+    Returns:
+        (PDF bytes, page count) per part, in page order
+    """
+    with _pdfium_lock:
+        return _split_pdf_locked(content, pages_per_part)
+
+
+def _split_pdf_locked(content: bytes, pages_per_part: int) -> List[Tuple[bytes, int]]:
+    """_split_pdf body; the caller holds _pdfium_lock"""
+    source = pdfium.PdfDocument(content)
+    try:
+        parts = []
+        for start in range(0, len(source), pages_per_part):
+            indices = list(range(start, min(start + pages_per_part, len(source))))
+            part = pdfium.PdfDocument.new()
+            try:
+                part.import_pages(source, pages=indices)
+                buffer = io.BytesIO()
+                part.save(buffer)
+            finally:
+                part.close()
+            parts.append((buffer.getvalue(), len(indices)))
+        return parts
+    finally:
+        source.close()
+
+
+def get_pdf_page_count(pdf_data: Union[bytes, str]) -> int:
+    """
+    Count the pages of a PDF with PDFium
+    
+    Args:
+        pdf_data: PDF bytes or file path
+        
+    Returns:
+        Number of pages
+    """
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(pdf_data)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+
+def render_pdf_page(pdf_data: Union[bytes, str], page_index: int, scale: float = 2.0) -> bytes:
+    """
+    Render one PDF page to PNG bytes with PDFium
+    
+    Args:
+        pdf_data: PDF bytes or file path
+        page_index: Zero-based page index
+        scale: Render scale (1.0 = 72 DPI)
+        
+    Returns:
+        PNG image bytes
+    """
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(pdf_data)
+        try:
+            page = pdf.get_page(page_index)
+            bitmap = page.render(scale=scale, rotation=0, crop=(0, 0, 0, 0))
+            # Copy out of PDFium's buffer so PNG encoding can run after the lock is released
+            pil_image = bitmap.to_pil().copy()
+        finally:
+            pdf.close()
+    
+    img_byte_arr = io.BytesIO()
+    pil_image.save(img_byte_arr, format='PNG')
+    return img_byte_arr.getvalue()
+
+
+def _read_image_content(image_data: Union[bytes, str]) -> bytes:
+    """Return image bytes, reading them from disk when given a file path"""
+    if isinstance(image_data, str):
+        with open(image_data, 'rb') as image_file:
+            return image_file.read()
+    return image_data
 
 class VisionService:
     """Google Cloud Vision API service for KMRL document OCR processing"""
     
     def __init__(self):
         """Initialize Vision client with KMRL-specific configuration"""
-        print("[VISION] Initializing Google Cloud Vision service for DataTrack-KMRL...")
-        self.client = Config.get_vision_client()
-        print("[VISION] ✅ Vision service ready for document processing")
+        logger.info("[VISION] Initializing Google Cloud Vision service for DataTrack-KMRL...")
+        self.client = _get_shared_vision_client()
+        logger.info("[VISION] ✅ Vision service ready for document processing")
+    
+    @staticmethod
+    def _ocr_cache_key(content: bytes, method: str) -> str:
+        """Build the OCR cache key from the image content hash and OCR method"""
+        return hashlib.blake2b(content, digest_size=16).hexdigest() + ":" + method
+    
+    @staticmethod
+    def _get_cached_result(cache_key: str) -> Optional[OCRResult]:
+        """Return a copy of a cached OCR result, or None on a miss"""
+        with _ocr_cache_lock:
+            result = _ocr_cache.get(cache_key)
+            if result is None:
+                return None
+            _ocr_cache.move_to_end(cache_key)
+        # Callers may mutate the result, so never hand out the cached instance
+        return dataclasses.replace(result)
+    
+    @staticmethod
+    def _store_cached_result(cache_key: str, result: OCRResult) -> None:
+        """Cache a successful OCR result, evicting the least recently used entry when full"""
+        if result.error:
+            return
+        with _ocr_cache_lock:
+            _ocr_cache[cache_key] = dataclasses.replace(result)
+            _ocr_cache.move_to_end(cache_key)
+            if len(_ocr_cache) > OCR_CACHE_MAX_ENTRIES:
+                _ocr_cache.popitem(last=False)
+    
+    def _annotate(self, content: bytes) -> DocumentAnnotation:
+        """
+        Run document text detection once per image content
+        
+        extract_text, detect_handwriting, detect_document_features and analyze all
+        read this annotation, so one RPC and one walk of the response serve every
+        view of an image.
+        
+        Args:
+            content: Image bytes
+            
+        Returns:
+            DocumentAnnotation (errors are reported in annotation.error)
+        """
+        cache_key = hashlib.blake2b(content, digest_size=16).hexdigest()
+        with _annotation_cache_lock:
+            annotation = _annotation_cache.get(cache_key)
+            if annotation is not None:
+                _annotation_cache.move_to_end(cache_key)
+                return annotation
+        
+        vision = _vision_module()
+        response = self.client.document_text_detection(image=vision.Image(content=_compress_for_upload(content)))
+        annotation = self._build_annotation(response)
+        self._store_annotation(cache_key, annotation)
+        return annotation
+    
+    @staticmethod
+    def _store_annotation(cache_key: str, annotation: DocumentAnnotation) -> None:
+        """Cache a successful annotation, evicting the least recently used entry when full"""
+        if annotation.error:
+            return
+        with _annotation_cache_lock:
+            _annotation_cache[cache_key] = annotation
+            _annotation_cache.move_to_end(cache_key)
+            if len(_annotation_cache) > ANNOTATION_CACHE_MAX_ENTRIES:
+                _annotation_cache.popitem(last=False)
+    
+    @staticmethod
+    def _build_annotation(response: vision.AnnotateImageResponse) -> DocumentAnnotation:
+        """Decode a document text detection response into a DocumentAnnotation"""
+        if response.error.message:
+            return DocumentAnnotation(text="", confidence=0.0, error=f"Vision API Error: {response.error.message}")
+        text, confidence = VisionService._document_text(response)
+        return DocumentAnnotation(text=text, confidence=confidence, features=VisionService._document_features(response))
+    
+    @staticmethod
+    def _document_text(response: vision.AnnotateImageResponse) -> Tuple[str, float]:
+        """Return full text and first-page confidence of a document annotation"""
+        if not response.full_text_annotation:
+            return "", 0.0
+        annotation = response.full_text_annotation
+        return annotation.text, annotation.pages[0].confidence if annotation.pages else 0.0
+    
+    @staticmethod
+    def _document_features(response: vision.AnnotateImageResponse) -> DocumentFeatures:
+        """Collect block, paragraph and word structure from a document annotation in one pass"""
+        annotation = response.full_text_annotation
+        features = DocumentFeatures(
+            has_text=bool(annotation),
+            page_count=len(annotation.pages) if annotation else 0
+        )
+        if not annotation:
+            return features
+        
+        # Append straight into the per-attribute columns
+        block_confidences = features.block_confidences
+        block_types = features.block_types
+        paragraph_confidences = features.paragraph_confidences
+        word_confidences = features.word_confidences
+        word_texts = features.word_texts
+        for page in annotation.pages:
+            for block in page.blocks:
+                block_confidences.append(block.confidence)
+                block_types.append(block.block_type.name)
+                for paragraph in block.paragraphs:
+                    paragraph_confidences.append(paragraph.confidence)
+                    for word in paragraph.words:
+                        word_confidences.append(word.confidence)
+                        word_texts.append(''.join(symbol.text for symbol in word.symbols))
+        return features
+    
+    @staticmethod
+    def _ocr_result_from_annotation(annotation: DocumentAnnotation) -> OCRResult:
+        """
+        Build a document OCRResult from a DocumentAnnotation
+        
+        Args:
+            annotation: Decoded document text detection
+            
+        Returns:
+            OCRResult with the extracted text, or with error set if Vision reported one
+        """
+        if annotation.error:
+            logger.error("[VISION] ❌ %s", annotation.error)
+            return OCRResult(
+                text="",
+                confidence=0.0,
+                method="document",
+                error=annotation.error
+            )
+        
+        if annotation.features.has_text:
+            logger.info("[VISION] ✅ Document OCR completed - Confidence: %.2f", annotation.confidence)
+            logger.debug("[VISION] Extracted text length: %d characters", len(annotation.text))
+        else:
+            logger.warning("[VISION] ⚠️ No text detected in document")
+        
+        # Log first 100 characters for debugging (without exposing sensitive data);
+        # %.100s truncates lazily, only when debug logging is enabled
+        logger.debug("[VISION] Text preview: %.100s", annotation.text)
+        
+        return OCRResult(
+            text=annotation.text,
+            confidence=annotation.confidence,
+            method="document",
+            error=None
+        )
+    
+    @staticmethod
+    def _ocr_result_from_response(response: vision.AnnotateImageResponse) -> OCRResult:
+        """
+        Build an OCRResult from a basic text detection response
+        
+        Args:
+            response: Vision AnnotateImageResponse from text_detection
+            
+        Returns:
+            OCRResult with the extracted text, or with error set if Vision reported one
+        """
+        if response.error.message:
+            error_msg = f"Vision API Error: {response.error.message}"
+            logger.error("[VISION] ❌ %s", error_msg)
+            return OCRResult(
+                text="",
+                confidence=0.0,
+                method="text",
+                error=error_msg
+            )
+        
+        if response.text_annotations:
+            text = response.text_annotations[0].description
+            confidence = 1.0  # Text detection doesn't provide confidence
+            logger.info("[VISION] ✅ Basic text extraction completed")
+            logger.debug("[VISION] Extracted text length: %d characters", len(text))
+        else:
+            text = ""
+            confidence = 0.0
+            logger.warning("[VISION] ⚠️ No text detected in image")
+        
+        logger.debug("[VISION] Text preview: %.100s", text)
+        
+        return OCRResult(
+            text=text,
+            confidence=confidence,
+            method="text",
+            error=None
+        )
     
     def extract_text(self, image_data: Union[bytes, str], method: str = 'document') -> OCRResult:
         """
@@ -34,88 +433,38 @@ class VisionService:
         Returns:
             OCRResult: Extracted text with confidence and metadata
         """
-        print(f"[VISION] Starting OCR processing with method: {method}")
+        logger.debug("[VISION] Starting OCR processing with method: %s", method)
         
         try:
             # Handle different input types
             if isinstance(image_data, str):
-                print(f"[VISION] Reading image from file: {image_data}")
-                with open(image_data, 'rb') as image_file:
-                    content = image_file.read()
+                logger.debug("[VISION] Reading image from file: %s", image_data)
             else:
-                print(f"[VISION] Processing image from bytes (size: {len(image_data)} bytes)")
-                content = image_data
+                logger.debug("[VISION] Processing image from bytes (size: %d bytes)", len(image_data))
+            content = _read_image_content(image_data)
             
-            image = vision.Image(content=content)
+            cache_key = self._ocr_cache_key(content, method)
+            cached_result = self._get_cached_result(cache_key)
+            if cached_result is not None:
+                logger.debug("[VISION] Using cached OCR result")
+                return cached_result
             
             # Choose OCR method based on KMRL document requirements
             if method == 'document':
-                print("[VISION] Using document text detection (recommended for KMRL reports/forms)")
-                response = self.client.document_text_detection(image=image)
-                
-                if response.error.message:
-                    error_msg = f"Vision API Error: {response.error.message}"
-                    print(f"[VISION] ❌ {error_msg}")
-                    return OCRResult(
-                        text="",
-                        confidence=0.0,
-                        method=method,
-                        error=error_msg
-                    )
-                
-                if response.full_text_annotation:
-                    text = response.full_text_annotation.text
-                    # Calculate confidence from page confidence
-                    confidence = (
-                        response.full_text_annotation.pages[0].confidence 
-                        if response.full_text_annotation.pages 
-                        else 0.0
-                    )
-                    print(f"[VISION] ✅ Document OCR completed - Confidence: {confidence:.2f}")
-                    print(f"[VISION] Extracted text length: {len(text)} characters")
-                else:
-                    text = ""
-                    confidence = 0.0
-                    print("[VISION] ⚠️ No text detected in document")
-                    
+                logger.debug("[VISION] Using document text detection (recommended for KMRL reports/forms)")
+                result = self._ocr_result_from_annotation(self._annotate(content))
             else:  # Basic text detection
-                print("[VISION] Using basic text detection")
-                response = self.client.text_detection(image=image)
-                
-                if response.error.message:
-                    error_msg = f"Vision API Error: {response.error.message}"
-                    print(f"[VISION] ❌ {error_msg}")
-                    return OCRResult(
-                        text="",
-                        confidence=0.0,
-                        method=method,
-                        error=error_msg
-                    )
-                
-                if response.text_annotations:
-                    text = response.text_annotations[0].description
-                    confidence = 1.0  # Text detection doesn't provide confidence
-                    print(f"[VISION] ✅ Basic text extraction completed")
-                    print(f"[VISION] Extracted text length: {len(text)} characters")
-                else:
-                    text = ""
-                    confidence = 0.0
-                    print("[VISION] ⚠️ No text detected in image")
-            
-            # Log first 100 characters for debugging (without exposing sensitive data)
-            preview = text[:100] + "..." if len(text) > 100 else text
-            print(f"[VISION] Text preview: {preview}")
+                logger.debug("[VISION] Using basic text detection")
+                vision = _vision_module()
+                response = self.client.text_detection(image=vision.Image(content=_compress_for_upload(content)))
+                result = self._ocr_result_from_response(response)
             
-            return OCRResult(
-                text=text,
-                confidence=confidence,
-                method=method,
-                error=None
-            )
+            self._store_cached_result(cache_key, result)
+            return result
             
         except Exception as e:
             error_msg = f"OCR processing failed: {str(e)}"
-            print(f"[VISION] ❌ {error_msg}")
+            logger.error("[VISION] ❌ %s", error_msg)
             return OCRResult(
                 text="",
                 confidence=0.0,
@@ -123,7 +472,179 @@ class VisionService:
                 error=error_msg
             )
     
-    def detect_document_features(self, image_data: Union[bytes, str]) -> dict:
+    def extract_text_bulk(self, images: List[Union[bytes, str]]) -> List[OCRResult]:
+        """
+        Extract text from many images using batched Vision requests
+        
+        Images are sent VISION_BATCH_SIZE at a time through batch_annotate_images
+        instead of one document_text_detection request each; cached images are
+        answered locally.
+        
+        Args:
+            images: Images as bytes or file paths
+            
+        Returns:
+            List of OCRResult objects in input order
+        """
+        logger.debug("[VISION] Starting bulk OCR for %d images", len(images))
+        
+        results: List[Optional[OCRResult]] = [None] * len(images)
+        pending = []  # (index, content, content digest) of images still needing OCR
+        
+        for index, image_data in enumerate(images):
+            try:
+                content = _read_image_content(image_data)
+            except Exception as e:
+                results[index] = OCRResult(
+                    text="",
+                    confidence=0.0,
+                    method="document",
+                    error=f"OCR processing failed: {str(e)}"
+                )
+                continue
+            
+            digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+            cached_result = self._get_cached_result(digest + ":document")
+            if cached_result is not None:
+                results[index] = cached_result
+            else:
+                pending.append((index, content, digest))
+        
+        batches = [pending[start:start + VISION_BATCH_SIZE]
+                   for start in range(0, len(pending), VISION_BATCH_SIZE)]
+        if batches:
+            logger.debug("[VISION] Sending %d uncached images in %d batch requests", len(pending), len(batches))
+            with ThreadPoolExecutor(max_workers=min(len(batches), VISION_BULK_MAX_CONCURRENCY)) as executor:
+                for batch, batch_results in zip(batches, executor.map(self._annotate_batch, batches)):
+                    for (index, _, _), result in zip(batch, batch_results):
+                        results[index] = result
+        
+        successful = sum(1 for r in results if not r.error)
+        logger.info("[VISION] ✅ Bulk OCR completed: %d/%d successful", successful, len(images))
+        
+        return results
+    
+    def _annotate_batch(self, batch: List[Tuple[int, bytes, str]]) -> List[OCRResult]:
+        """
+        Run document text detection for up to VISION_BATCH_SIZE images in one request
+        
+        Args:
+            batch: (index, content, content digest) tuples
+            
+        Returns:
+            List of OCRResult objects aligned with batch
+        """
+        vision = _vision_module()
+        feature = vision.Feature(type_=vision.Feature.Type.DOCUMENT_TEXT_DETECTION)
+        requests = [
+            vision.AnnotateImageRequest(image=vision.Image(content=_compress_for_upload(content)), features=[feature])
+            for _, content, _ in batch
+        ]
+        
+        try:
+            batch_response = self.client.batch_annotate_images(requests=requests)
+        except Exception as e:
+            error_msg = f"OCR processing failed: {str(e)}"
+            logger.error("[VISION] ❌ %s", error_msg)
+            return [
+                OCRResult(text="", confidence=0.0, method="document", error=error_msg)
+                for _ in batch
+            ]
+        
+        results = []
+        for (_, _, digest), response in zip(batch, batch_response.responses):
+            annotation = self._build_annotation(response)
+            if annotation.error:
+                results.append(OCRResult(
+                    text="",
+                    confidence=0.0,
+                    method="document",
+                    error=annotation.error
+                ))
+                continue
+            
+            self._store_annotation(digest, annotation)
+            result = OCRResult(
+                text=annotation.text,
+                confidence=annotation.confidence,
+                method="document",
+                error=None
+            )
+            self._store_cached_result(digest + ":document", result)
+            results.append(result)
+        return results
+    
+    def extract_text_pdf(self, pdf_data: Union[bytes, str], page_count: int, method: str = 'document') -> List[OCRResult]:
+        """
+        OCR a scanned PDF directly with Vision's files API
+        
+        The PDF is split into documents of VISION_PDF_PAGES_PER_REQUEST pages,
+        each OCRed with one batch_annotate_files request, instead of rendering
+        every page to an image and sending one request per page. Every page is
+        uploaded once, in the request for its own part.
+        
+        Args:
+            pdf_data: PDF as bytes or file path
+            page_count: Number of pages in the PDF
+            method: 'document' (recommended for KMRL docs) or 'text' (basic OCR)
+            
+        Returns:
+            List of OCRResult objects, one per page in page order
+        """
+        logger.debug("[VISION] Starting PDF OCR for %d pages with method: %s", page_count, method)
+        
+        parts = _split_pdf(_read_image_content(pdf_data), VISION_PDF_PAGES_PER_REQUEST)
+        if not parts:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(len(parts), VISION_BULK_MAX_CONCURRENCY)) as executor:
+            batches = executor.map(lambda part: self._annotate_pdf_pages(part[0], part[1], method), parts)
+            results = [result for batch_results in batches for result in batch_results]
+        
+        successful = sum(1 for r in results if not r.error)
+        logger.info("[VISION] ✅ PDF OCR completed: %d/%d pages successful", successful, page_count)
+        
+        return results
+    
+    def _annotate_pdf_pages(self, content: bytes, part_page_count: int, method: str) -> List[OCRResult]:
+        """
+        OCR every page of a PDF of up to VISION_PDF_PAGES_PER_REQUEST pages in one request
+        
+        Args:
+            content: PDF bytes
+            part_page_count: Number of pages in the PDF
+            method: 'document' or 'text', as for extract_text
+            
+        Returns:
+            List of OCRResult objects, one per page
+        """
+        vision = _vision_module()
+        if method == 'document':
+            feature_type = vision.Feature.Type.DOCUMENT_TEXT_DETECTION
+        else:  # Basic text detection
+            feature_type = vision.Feature.Type.TEXT_DETECTION
+        request = vision.AnnotateFileRequest(
+            input_config=vision.InputConfig(content=content, mime_type="application/pdf"),
+            features=[vision.Feature(type_=feature_type)],
+            pages=list(range(1, part_page_count + 1))
+        )
+        
+        try:
+            batch_response = self.client.batch_annotate_files(requests=[request])
+            responses = batch_response.responses[0].responses
+        except Exception as e:
+            error_msg = f"OCR processing failed: {str(e)}"
+            logger.error("[VISION] ❌ %s", error_msg)
+            return [
+                OCRResult(text="", confidence=0.0, method=method, error=error_msg)
+                for _ in range(part_page_count)
+            ]
+        
+        if method == 'document':
+            return [self._ocr_result_from_annotation(self._build_annotation(response)) for response in responses]
+        return [self._ocr_result_from_response(response) for response in responses]
+    
+    def detect_document_features(self, image_data: Union[bytes, str]) -> DocumentFeatures:
         """
         Detect document features like tables, forms - Useful for KMRL structured documents
         
@@ -131,63 +652,34 @@ class VisionService:
             image_data: Image as bytes or file path
             
         Returns:
-            Dictionary with detected document features
+            DocumentFeatures with per-block, per-paragraph and per-word columns
+            (use to_dict() for the JSON list-of-objects shape)
         """
-        print("[VISION] Analyzing document structure and features...")
+        logger.debug("[VISION] Analyzing document structure and features...")
         
         try:
-            if isinstance(image_data, str):
-                with open(image_data, 'rb') as image_file:
-                    content = image_file.read()
-            else:
-                content = image_data
-            
-            image = vision.Image(content=content)
+            content = _read_image_content(image_data)
             
             # Get document text detection with structure
-            response = self.client.document_text_detection(image=image)
-            
-            if response.error.message:
-                raise Exception(f"Vision API Error: {response.error.message}")
-            
-            features = {
-                'has_text': bool(response.full_text_annotation),
-                'page_count': len(response.full_text_annotation.pages) if response.full_text_annotation else 0,
-                'blocks': [],
-                'paragraphs': [],
-                'words': []
-            }
-            
-            if response.full_text_annotation:
-                for page in response.full_text_annotation.pages:
-                    for block in page.blocks:
-                        features['blocks'].append({
-                            'confidence': block.confidence,
-                            'block_type': block.block_type.name if hasattr(block, 'block_type') else 'TEXT'
-                        })
-                        
-                        for paragraph in block.paragraphs:
-                            features['paragraphs'].append({
-                                'confidence': paragraph.confidence
-                            })
-                            
-                            for word in paragraph.words:
-                                features['words'].append({
-                                    'confidence': word.confidence,
-                                    'text': ''.join([symbol.text for symbol in word.symbols])
-                                })
-            
-            print(f"[VISION] ✅ Document analysis completed:")
-            print(f"[VISION]   - Pages: {features['page_count']}")
-            print(f"[VISION]   - Text blocks: {len(features['blocks'])}")
-            print(f"[VISION]   - Paragraphs: {len(features['paragraphs'])}")
-            print(f"[VISION]   - Words: {len(features['words'])}")
+            annotation = self._annotate(content)
+            
+            if annotation.error:
+                raise Exception(annotation.error)
+            
+            # The annotation is cached and shared, so hand out a copy
+            features = annotation.features.copy()
+            
+            logger.info("[VISION] ✅ Document analysis completed:")
+            logger.debug("[VISION]   - Pages: %s", features.page_count)
+            logger.debug("[VISION]   - Text blocks: %d", len(features.block_confidences))
+            logger.debug("[VISION]   - Paragraphs: %d", len(features.paragraph_confidences))
+            logger.debug("[VISION]   - Words: %d", len(features.word_confidences))
             
             return features
             
         except Exception as e:
             error_msg = f"Document feature detection failed: {str(e)}"
-            print(f"[VISION] ❌ {error_msg}")
+            logger.error("[VISION] ❌ %s", error_msg)
             raise Exception(error_msg)
     
     def detect_handwriting(self, image_data: Union[bytes, str]) -> OCRResult:
@@ -200,51 +692,48 @@ class VisionService:
         Returns:
             OCRResult with handwritten text extraction
         """
-        print("[VISION] Processing handwritten text detection...")
+        logger.debug("[VISION] Processing handwritten text detection...")
         
         try:
-            if isinstance(image_data, str):
-                with open(image_data, 'rb') as image_file:
-                    content = image_file.read()
-            else:
-                content = image_data
+            content = _read_image_content(image_data)
             
-            image = vision.Image(content=content)
+            cache_key = self._ocr_cache_key(content, "handwriting")
+            cached_result = self._get_cached_result(cache_key)
+            if cached_result is not None:
+                logger.debug("[VISION] Using cached handwriting result")
+                return cached_result
             
             # Use document text detection which handles handwriting better
-            response = self.client.document_text_detection(image=image)
+            annotation = self._annotate(content)
             
-            if response.error.message:
+            if annotation.error:
                 return OCRResult(
                     text="",
                     confidence=0.0,
                     method="handwriting",
-                    error=f"Vision API Error: {response.error.message}"
+                    error=annotation.error
                 )
             
-            if response.full_text_annotation:
-                text = response.full_text_annotation.text
-                confidence = (
-                    response.full_text_annotation.pages[0].confidence 
-                    if response.full_text_annotation.pages 
-                    else 0.0
-                )
-                print(f"[VISION] ✅ Handwriting detection completed - Confidence: {confidence:.2f}")
+            if annotation.features.has_text:
+                text, confidence = annotation.text, annotation.confidence
+                logger.info("[VISION] ✅ Handwriting detection completed - Confidence: %.2f", confidence)
             else:
                 text = ""
                 confidence = 0.0
-                print("[VISION] ⚠️ No handwritten text detected")
+                logger.warning("[VISION] ⚠️ No handwritten text detected")
             
-            return OCRResult(
+            result = OCRResult(
                 text=text,
                 confidence=confidence,
                 method="handwriting",
                 error=None
             )
+            self._store_cached_result(cache_key, result)
+            return result
             
         except Exception as e:
             error_msg = f"Handwriting detection failed: {str(e)}"
-            print(f"[VISION] ❌ {error_msg}")
+            logger.error("[VISION] ❌ %s", error_msg)
             return OCRResult(
                 text="",
                 confidence=0.0,
@@ -252,8 +741,155 @@ class VisionService:
                 error=error_msg
             )
     
+    def analyze(self, image_data: Union[bytes, str]) -> DocumentAnalysis:
+        """
+        Run OCR, structure and handwriting analysis from a single Vision request
+        
+        Args:
+            image_data: Image as bytes or file path
+            
+        Returns:
+            DocumentAnalysis bundling the OCR result, document features and
+            handwriting confidence
+        """
+        logger.debug("[VISION] Running combined document analysis...")
+        
+        try:
+            content = _read_image_content(image_data)
+            annotation = self._annotate(content)
+            
+            if annotation.error:
+                logger.error("[VISION] ❌ %s", annotation.error)
+                return DocumentAnalysis(
+                    ocr=OCRResult(text="", confidence=0.0, method="document", error=annotation.error),
+                    error=annotation.error
+                )
+            
+            text, confidence = annotation.text, annotation.confidence
+            features = annotation.features.copy()
+            logger.info("[VISION] ✅ Document analysis completed - %d characters, %d words, confidence: %.2f",
+                        len(text), len(features.word_confidences), confidence)
+            
+            return DocumentAnalysis(
+                ocr=OCRResult(text=text, confidence=confidence, method="document", error=None),
+                features=features,
+                handwriting_confidence=confidence
+            )
+            
+        except Exception as e:
+            error_msg = f"Document analysis failed: {str(e)}"
+            logger.error("[VISION] ❌ %s", error_msg)
+            return DocumentAnalysis(
+                ocr=OCRResult(text="", confidence=0.0, method="document", error=error_msg),
+                error=error_msg
+            )
+    
+    async def _call_with_backoff(self, call, **kwargs):
+        """
+        Await an async Vision call under the shared concurrency cap, retrying
+        quota and deadline errors with jittered exponential back-off
+        """
+        from google.api_core import exceptions as google_exceptions
+        
+        delay = VISION_RETRY_INITIAL_DELAY
+        for attempt in range(VISION_RETRY_ATTEMPTS):
+            try:
+                async with _async_ocr_semaphore:
+                    return await call(**kwargs)
+            except (google_exceptions.ResourceExhausted, google_exceptions.DeadlineExceeded) as e:
+                if attempt == VISION_RETRY_ATTEMPTS - 1:
+                    raise
+                wait = random.uniform(0, delay)
+                logger.warning("[VISION] ⚠️ %s, retrying in %.2fs", type(e).__name__, wait)
+                await asyncio.sleep(wait)
+                delay = min(delay * 2, VISION_RETRY_MAX_DELAY)
+    
+    async def _annotate_image_async(self, content: bytes, method: str) -> vision.AnnotateImageResponse:
+        """
+        Run text detection for one image through the async Vision client
+        
+        The async client has no per-feature helpers (document_text_detection,
+        text_detection), so the request goes through batch_annotate_images.
+        
+        Args:
+            content: Image bytes
+            method: 'document' for document text detection, otherwise basic text detection
+            
+        Returns:
+            The image's AnnotateImageResponse
+        """
+        vision = _vision_module()
+        if method == 'document':
+            feature_type = vision.Feature.Type.DOCUMENT_TEXT_DETECTION
+        else:  # Basic text detection
+            feature_type = vision.Feature.Type.TEXT_DETECTION
+        request = vision.AnnotateImageRequest(
+            image=vision.Image(content=await _run_in_ocr_executor(_compress_for_upload, content)),
+            features=[vision.Feature(type_=feature_type)]
+        )
+        batch_response = await self._call_with_backoff(
+            _get_shared_vision_async_client().batch_annotate_images, requests=[request]
+        )
+        return batch_response.responses[0]
+    
     async def extract_text_async(self, image_data: Union[bytes, str], method: str = 'document') -> OCRResult:
         """Async version of extract_text for high-performance processing"""
-        print("[VISION] Running async OCR processing...")
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self.extract_text, image_data, method)
+        logger.debug("[VISION] Running async OCR processing...")
+        
+        try:
+            if isinstance(image_data, str):
+                content = await _run_in_ocr_executor(_read_image_content, image_data)
+            else:
+                content = image_data
+            
+            digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+            cache_key = digest + ":" + method
+            cached_result = self._get_cached_result(cache_key)
+            if cached_result is not None:
+                logger.debug("[VISION] Using cached OCR result")
+                return cached_result
+            
+            if method == 'document':
+                with _annotation_cache_lock:
+                    annotation = _annotation_cache.get(digest)
+                if annotation is None:
+                    response = await self._annotate_image_async(content, method)
+                    annotation = self._build_annotation(response)
+                    self._store_annotation(digest, annotation)
+                result = self._ocr_result_from_annotation(annotation)
+            else:
+                response = await self._annotate_image_async(content, method)
+                result = self._ocr_result_from_response(response)
+            
+            self._store_cached_result(cache_key, result)
+            return result
+            
+        except Exception as e:
+            error_msg = f"OCR processing failed: {str(e)}"
+            logger.error("[VISION] ❌ %s", error_msg)
+            return OCRResult(
+                text="",
+                confidence=0.0,
+                method=method,
+                error=error_msg
+            )
+    
+    async def extract_text_many_async(self, images: List[Union[bytes, str]], method: str = 'document') -> List[OCRResult]:
+        """
+        OCR many images concurrently through the async Vision client
+        
+        Concurrency is capped by VISION_ASYNC_MAX_CONCURRENCY across all callers.
+        
+        Args:
+            images: Images as bytes or file paths
+            method: 'document' or 'text'
+            
+        Returns:
+            List of OCRResult objects in input order
+        """
+        logger.debug("[VISION] Starting async OCR fan-out for %d images", len(images))
+        results = await asyncio.gather(*(self.extract_text_async(image_data, method) for image_data in images))
+        
+        successful = sum(1 for r in results if not r.error)
+        logger.info("[VISION] ✅ Async OCR completed: %d/%d successful", successful, len(images))
+        return list(results)
@@ -1,10 +1,19 @@
 # DataTrack KMRL - Translation Service
 # Google Cloud Translation API for English/Malayalam support
 
+from __future__ import annotations
+
 import sys
 import os
-from typing import Optional, List, Dict, Any
-from google.cloud import translate_v2 as translate
+import re
+import functools
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, Tuple
+
+if TYPE_CHECKING:
+    from google.cloud import translate_v2 as translate
 
 # Add parent directories to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -12,14 +21,61 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config.settings import Config
 from models.ocr_models import LanguageDetectionResult, TranslationResult
 
+logger = logging.getLogger(__name__)
+
+# Translation v2 accepts at most 128 texts per request
+TRANSLATE_BATCH_SIZE = 128
+
+# The supported-language list rarely changes; refetch it at most once an hour
+SUPPORTED_LANGUAGES_TTL_SECONDS = 3600
+
+# (fetched_at, languages) of the last successful get_supported_languages call
+_supported_languages_cache: Optional[Tuple[float, List[Dict[str, Any]]]] = None
+_supported_languages_lock = threading.Lock()
+
+# Local script check used before calling the detection API; KMRL text is
+# overwhelmingly plain English or Malayalam, which can be told apart by code point
+_MALAYALAM_CHARS = re.compile('[\u0D00-\u0D7F]')
+_ASCII_LETTERS = re.compile('[A-Za-z]')
+MALAYALAM_SCRIPT_RATIO = 0.3
+ENGLISH_LETTER_RATIO = 0.5
+LOCAL_DETECTION_CONFIDENCE = 0.99
+
+
+def _detect_script_locally(sample: str) -> Optional[str]:
+    """
+    Classify clearly English or clearly Malayalam text without an API call
+    
+    Args:
+        sample: Text sample to inspect
+        
+    Returns:
+        'ml', 'en', or None when the text needs the detection API
+    """
+    if not sample:
+        return None
+    
+    # isascii() is a single C-level scan; non-ASCII Latin text (French, German...)
+    # is left to the API rather than guessed as English
+    if sample.isascii():
+        return 'en' if len(_ASCII_LETTERS.findall(sample)) > ENGLISH_LETTER_RATIO * len(sample) else None
+    if len(_MALAYALAM_CHARS.findall(sample)) > MALAYALAM_SCRIPT_RATIO * len(sample):
+        return 'ml'
+    return None
+
+@functools.lru_cache(maxsize=None)
+def _get_shared_translate_client() -> translate.Client:
+    """Translation client shared by every TranslationService so its connection pool is reused"""
+    return Config.get_translate_client()
+
 class TranslationService:
     """Google Cloud Translation API service for KMRL multilingual support"""
     
     def __init__(self):
         """Initialize Translation client for English/Malayalam processing"""
-        print("[TRANSLATION] Initializing Google Cloud Translation service for DataTrack-KMRL...")
-        self.client = Config.get_translate_client()
-        print("[TRANSLATION] ✅ Translation service ready for English/Malayalam processing")
+        logger.info("[TRANSLATION] Initializing Google Cloud Translation service for DataTrack-KMRL...")
+        self.client = _get_shared_translate_client()
+        logger.info("[TRANSLATION] ✅ Translation service ready for English/Malayalam processing")
     
     def detect_language(self, text: str) -> LanguageDetectionResult:
         """
@@ -31,23 +87,30 @@ class TranslationService:
         Returns:
             LanguageDetectionResult with detected language info
         """
-        print(f"[TRANSLATION] Detecting language for text (length: {len(text)} chars)")
+        logger.debug("[TRANSLATION] Detecting language for text (length: %d chars)", len(text))
         
         try:
             # Use only first 1000 chars for language detection (API limit + efficiency)
             sample_text = text[:1000] if len(text) > 1000 else text
             
-            result = self.client.detect_language(sample_text)
+            # Plain English or Malayalam is classified locally; only mixed or
+            # other scripts go to the API
+            language_code = _detect_script_locally(sample_text)
+            if language_code is not None:
+                confidence = LOCAL_DETECTION_CONFIDENCE
+                logger.debug("[TRANSLATION] Language classified locally from script: %s", language_code)
+            else:
+                result = self.client.detect_language(sample_text)
+                language_code = result['language']
+                confidence = result.get('confidence', 0.0)
             
-            language_code = result['language']
-            confidence = result.get('confidence', 0.0)
             language_name = Config.get_language_name(language_code)
             
-            print(f"[TRANSLATION] ✅ Language detected: {language_name} ({language_code}) - Confidence: {confidence:.2f}")
+            logger.info("[TRANSLATION] ✅ Language detected: %s (%s) - Confidence: %.2f", language_name, language_code, confidence)
             
             # Special handling for KMRL primary languages
             if language_code in ['en', 'ml']:
-                print(f"[TRANSLATION] 🎯 KMRL primary language detected: {language_name}")
+                logger.info("[TRANSLATION] 🎯 KMRL primary language detected: %s", language_name)
             
             return LanguageDetectionResult(
                 language_code=language_code,
@@ -58,7 +121,7 @@ class TranslationService:
             
         except Exception as e:
             error_msg = f"Language detection failed: {str(e)}"
-            print(f"[TRANSLATION] ❌ {error_msg}")
+            logger.error("[TRANSLATION] ❌ %s", error_msg)
             return LanguageDetectionResult(
                 language_code="unknown",
                 language_name="Unknown",
@@ -81,39 +144,22 @@ class TranslationService:
         Returns:
             TranslationResult with translation details
         """
-        print(f"[TRANSLATION] Translating text to {target_language} (length: {len(text)} chars)")
+        logger.debug("[TRANSLATION] Translating text to %s (length: %d chars)", target_language, len(text))
         
         try:
-            # Auto-detect source language if not provided
-            if source_language is None:
-                detection = self.detect_language(text)
-                if detection.error:
-                    return TranslationResult(
-                        original_text=text,
-                        translated_text="",
-                        source_language="unknown",
-                        target_language=target_language,
-                        source_language_name="Unknown",
-                        target_language_name=Config.get_language_name(target_language),
-                        error=f"Could not detect source language: {detection.error}"
-                    )
-                source_language = detection.language_code
-                print(f"[TRANSLATION] Auto-detected source language: {detection.language_name}")
+            # Plain English or Malayalam text already in the target language needs no
+            # RPC; the local script check only answers for those two languages
+            if source_language is None and _detect_script_locally(text[:1000]) == target_language:
+                logger.debug("[TRANSLATION] Text already in %s by local script check, skipping translation", target_language)
+                return self._untranslated_result(text, target_language)
             
             # Skip translation if source and target are the same
             if source_language == target_language:
-                print(f"[TRANSLATION] ⚠️ Source and target languages are the same ({source_language}), skipping translation")
-                return TranslationResult(
-                    original_text=text,
-                    translated_text=text,
-                    source_language=source_language,
-                    target_language=target_language,
-                    source_language_name=Config.get_language_name(source_language),
-                    target_language_name=Config.get_language_name(target_language),
-                    error=None
-                )
-            
-            # Perform translation
+                logger.warning("[TRANSLATION] ⚠️ Source and target languages are the same (%s), skipping translation", source_language)
+                return self._untranslated_result(text, target_language)
+            
+            # Perform translation; with no source language the API detects it in
+            # the same call and reports it as detectedSourceLanguage
             result = self.client.translate(
                 text,
                 target_language=target_language,
@@ -123,17 +169,19 @@ class TranslationService:
             
             translated_text = result['translatedText']
             detected_source = result.get('detectedSourceLanguage', source_language)
+            if source_language is None:
+                logger.debug("[TRANSLATION] Auto-detected source language: %s", Config.get_language_name(detected_source))
             
-            print(f"[TRANSLATION] ✅ Translation completed:")
-            print(f"[TRANSLATION]   - From: {Config.get_language_name(detected_source)}")
-            print(f"[TRANSLATION]   - To: {Config.get_language_name(target_language)}")
-            print(f"[TRANSLATION]   - Original length: {len(text)} chars")
-            print(f"[TRANSLATION]   - Translated length: {len(translated_text)} chars")
+            logger.info("[TRANSLATION] ✅ Translation completed:")
+            logger.debug("[TRANSLATION]   - From: %s", Config.get_language_name(detected_source))
+            logger.debug("[TRANSLATION]   - To: %s", Config.get_language_name(target_language))
+            logger.debug("[TRANSLATION]   - Original length: %d chars", len(text))
+            logger.debug("[TRANSLATION]   - Translated length: %d chars", len(translated_text))
             
             # Special logging for KMRL language pairs
             if (detected_source == 'ml' and target_language == 'en') or \
                (detected_source == 'en' and target_language == 'ml'):
-                print(f"[TRANSLATION] 🎯 KMRL primary language pair processed: {detected_source} → {target_language}")
+                logger.info("[TRANSLATION] 🎯 KMRL primary language pair processed: %s → %s", detected_source, target_language)
             
             return TranslationResult(
                 original_text=text,
@@ -147,7 +195,7 @@ class TranslationService:
             
         except Exception as e:
             error_msg = f"Translation failed: {str(e)}"
-            print(f"[TRANSLATION] ❌ {error_msg}")
+            logger.error("[TRANSLATION] ❌ %s", error_msg)
             return TranslationResult(
                 original_text=text,
                 translated_text="",
@@ -158,6 +206,20 @@ class TranslationService:
                 error=error_msg
             )
     
+    @staticmethod
+    def _untranslated_result(text: str, language: str) -> TranslationResult:
+        """TranslationResult for text that is already in the target language"""
+        language_name = Config.get_language_name(language)
+        return TranslationResult(
+            original_text=text,
+            translated_text=text,
+            source_language=language,
+            target_language=language,
+            source_language_name=language_name,
+            target_language_name=language_name,
+            error=None
+        )
+    
     def get_supported_languages(self) -> List[Dict[str, str]]:
         """
         Get list of supported languages with focus on KMRL relevant languages
@@ -165,7 +227,14 @@ class TranslationService:
         Returns:
             List of language dictionaries with code and name
         """
-        print("[TRANSLATION] Fetching supported languages...")
+        global _supported_languages_cache
+        with _supported_languages_lock:
+            cached = _supported_languages_cache
+        if cached is not None and time.monotonic() - cached[0] < SUPPORTED_LANGUAGES_TTL_SECONDS:
+            logger.debug("[TRANSLATION] Using cached supported languages")
+            return [dict(language) for language in cached[1]]
+        
+        logger.debug("[TRANSLATION] Fetching supported languages...")
         
         try:
             result = self.client.get_languages()
@@ -183,14 +252,16 @@ class TranslationService:
             # Sort to put KMRL primary languages first
             languages.sort(key=lambda x: (not x['is_kmrl_primary'], x['name']))
             
-            print(f"[TRANSLATION] ✅ Retrieved {len(languages)} supported languages")
-            print("[TRANSLATION] KMRL primary languages: English, Malayalam")
+            logger.info("[TRANSLATION] ✅ Retrieved %d supported languages", len(languages))
+            logger.debug("[TRANSLATION] KMRL primary languages: English, Malayalam")
             
-            return languages
+            with _supported_languages_lock:
+                _supported_languages_cache = (time.monotonic(), languages)
+            return [dict(language) for language in languages]
             
         except Exception as e:
             error_msg = f"Failed to get supported languages: {str(e)}"
-            print(f"[TRANSLATION] ❌ {error_msg}")
+            logger.error("[TRANSLATION] ❌ %s", error_msg)
             # Return at least the KMRL primary languages
             return [
                 {'code': 'en', 'name': 'English', 'is_kmrl_primary': True},
@@ -212,15 +283,80 @@ class TranslationService:
         Returns:
             List of TranslationResult objects
         """
-        print(f"[TRANSLATION] Starting batch translation for {len(texts)} texts to {target_language}")
+        logger.debug("[TRANSLATION] Starting batch translation for %d texts to %s", len(texts), target_language)
         
         results = []
-        for i, text in enumerate(texts):
-            print(f"[TRANSLATION] Processing batch item {i+1}/{len(texts)}")
-            result = self.translate_text(text, target_language, source_language)
-            results.append(result)
+        for start in range(0, len(texts), TRANSLATE_BATCH_SIZE):
+            chunk = texts[start:start + TRANSLATE_BATCH_SIZE]
+            logger.debug("[TRANSLATION] Processing batch items %d-%d/%d", start + 1, start + len(chunk), len(texts))
+            results.extend(self._translate_chunk(chunk, target_language, source_language))
         
         successful = sum(1 for r in results if not r.error)
-        print(f"[TRANSLATION] ✅ Batch translation completed: {successful}/{len(texts)} successful")
+        logger.info("[TRANSLATION] ✅ Batch translation completed: %d/%d successful", successful, len(texts))
+        
+        return results
+    
+    def _translate_chunk(self,
+                         texts: List[str],
+                         target_language: str,
+                         source_language: Optional[str]) -> List[TranslationResult]:
+        """
+        Translate up to TRANSLATE_BATCH_SIZE texts with a single API call
+        
+        Falls back to per-text translate_text calls if the batched call fails,
+        so one bad item does not fail the whole chunk.
         
-        return results
\ No newline at end of file
+        Args:
+            texts: Texts to translate
+            target_language: Target language code
+            source_language: Source language code (auto-detect if None)
+            
+        Returns:
+            List of TranslationResult objects aligned with texts
+        """
+        # Same-language requests never reach the API
+        if source_language == target_language:
+            return [self.translate_text(text, target_language, source_language) for text in texts]
+        
+        # Texts the local script check already places in the target language are
+        # answered without an RPC; only the rest go into the batched call
+        results: List[Optional[TranslationResult]] = [None] * len(texts)
+        pending = []
+        for index, text in enumerate(texts):
+            if source_language is None and _detect_script_locally(text[:1000]) == target_language:
+                results[index] = self._untranslated_result(text, target_language)
+            else:
+                pending.append(index)
+        if not pending:
+            return results
+        if len(pending) < len(texts):
+            logger.debug("[TRANSLATION] %d/%d texts already in %s, skipping them", len(texts) - len(pending), len(texts), target_language)
+        
+        pending_texts = [texts[index] for index in pending]
+        try:
+            translations = self.client.translate(
+                pending_texts,
+                target_language=target_language,
+                source_language=source_language,
+                format_='text'
+            )
+        except Exception as e:
+            logger.warning("[TRANSLATION] ⚠️ Batched translation failed (%s), translating items individually", e)
+            for index in pending:
+                results[index] = self.translate_text(texts[index], target_language, source_language)
+            return results
+        
+        target_language_name = Config.get_language_name(target_language)
+        for index, translation in zip(pending, translations):
+            text = texts[index]
+            detected_source = translation.get('detectedSourceLanguage', source_language)
+            results[index] = TranslationResult(
+                original_text=text,
+                translated_text=translation['translatedText'],
+                source_language=detected_source,
+                target_language=target_language,
+                source_language_name=Config.get_language_name(detected_source),
+                target_language_name=target_language_name,
+                error=None
+            )
+        return results
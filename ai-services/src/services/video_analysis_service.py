@@ -3,27 +3,210 @@ Video Analysis Service - Direct Gemini Integration for Video Processing
 Analyzes video files using Google's Gemini Vision API
 """
 
+import asyncio
+import contextlib
+import functools
+import hashlib
+import json
+import logging
+import threading
+import time
 import google.generativeai as genai
+import requests
 import tempfile
 import os
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import mimetypes
+import sys
+
+# Add parent directories to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import Config
+from models.ocr_models import VideoAnalysisResult
+
+logger = logging.getLogger(__name__)
+
+
+# Gemini's File API has no completion callback, so uploads are polled until they
+# leave PROCESSING; the interval grows from 0.25s to 5s so short videos are picked
+# up quickly and long ones don't burn get_file calls
+PROCESSING_POLL_INITIAL_DELAY = 0.25
+PROCESSING_POLL_MAX_DELAY = 5.0
+PROCESSING_POLL_BACKOFF = 1.6
+
+# Fallbacks for extensions mimetypes doesn't map to a video/* type
+_VIDEO_MIME_TYPES = {
+    '.mp4': 'video/mp4',
+    '.avi': 'video/x-msvideo',
+    '.mov': 'video/quicktime',
+    '.mkv': 'video/x-matroska',
+    '.webm': 'video/webm'
+}
+
+# Gemini File API resumable upload endpoint; the video body is streamed from disk in
+# one finalize request, so reading the file overlaps with sending it
+GEMINI_UPLOAD_URL = "https://generativelanguage.googleapis.com/upload/v1beta/files"
+GEMINI_UPLOAD_TIMEOUT = (10, 300)  # (connect, read) seconds
+
+# Uploads/generations analyze_videos_batch runs at once
+VIDEO_BATCH_MAX_CONCURRENCY = 6
+
+# Uploaded files are kept on Gemini and reused for identical video content, keyed by
+# SHA-256; Gemini deletes uploads after 48h, so entries are trusted for a bit less
+UPLOAD_CACHE_TTL_SECONDS = 47 * 3600
+UPLOAD_CACHE_MAX_ENTRIES = 256
+UPLOAD_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "datatrack", "gemini_files.json")
+
+# digest -> (Gemini file name, upload time as a Unix timestamp); loaded from disk on first use
+_upload_cache: Optional[Dict[str, Tuple[str, float]]] = None
+_upload_cache_lock = threading.Lock()
+
+
+def _fadvise(fd: int, advice_name: str) -> None:
+    """Give the kernel a page-cache hint for fd where posix_fadvise exists (Linux)"""
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(fd, 0, 0, getattr(os, advice_name))
+        except OSError:
+            pass
+
+
+@functools.lru_cache(maxsize=1)
+def _upload_session() -> requests.Session:
+    """Shared HTTP session so uploads reuse pooled connections to the File API"""
+    return requests.Session()
+
+
+@contextlib.contextmanager
+def _open_sequential(path: str):
+    """
+    Open a file that is read start to finish once (hashing, then upload)
+    
+    The kernel is told to read ahead aggressively, and the file's pages are dropped
+    from the page cache on close so a 100MB video doesn't evict hotter data.
+    """
+    stream = open(path, 'rb')
+    try:
+        _fadvise(stream.fileno(), 'POSIX_FADV_SEQUENTIAL')
+        yield stream
+    finally:
+        _fadvise(stream.fileno(), 'POSIX_FADV_DONTNEED')
+        stream.close()
+
+
+def _stream_sha256(stream) -> str:
+    """SHA-256 of an open binary file, streamed so large videos are never loaded whole"""
+    # Python 3.11+ hashes straight from the file with readinto into a reused buffer
+    if hasattr(hashlib, 'file_digest'):
+        return hashlib.file_digest(stream, 'sha256').hexdigest()
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(1024 * 1024), b''):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_upload_cache() -> Dict[str, Tuple[str, float]]:
+    """Return the upload cache, reading it from UPLOAD_CACHE_PATH the first time (lock held)"""
+    global _upload_cache
+    if _upload_cache is None:
+        try:
+            with open(UPLOAD_CACHE_PATH, 'r') as cache_file:
+                _upload_cache = {digest: (name, uploaded_at) for digest, (name, uploaded_at) in json.load(cache_file).items()}
+        except (OSError, ValueError, TypeError):
+            _upload_cache = {}
+    return _upload_cache
+
+
+def _save_upload_cache(cache: Dict[str, Tuple[str, float]]) -> None:
+    """Write the upload cache to disk so uploads survive restarts (lock held)"""
+    try:
+        os.makedirs(os.path.dirname(UPLOAD_CACHE_PATH), exist_ok=True)
+        temp_path = UPLOAD_CACHE_PATH + ".tmp"
+        with open(temp_path, 'w') as cache_file:
+            json.dump(cache, cache_file)
+        os.replace(temp_path, UPLOAD_CACHE_PATH)
+    except OSError as e:
+        logger.warning("[VIDEO] ⚠️ Could not save upload cache: %s", e)
+
+
+def _cached_upload_name(digest: str) -> Optional[str]:
+    """Gemini file name previously uploaded for this content, if it has not expired"""
+    with _upload_cache_lock:
+        cache = _load_upload_cache()
+        entry = cache.get(digest)
+        if entry is None:
+            return None
+        if time.time() - entry[1] > UPLOAD_CACHE_TTL_SECONDS:
+            del cache[digest]
+            _save_upload_cache(cache)
+            return None
+        return entry[0]
+
+
+def _remember_upload(digest: str, name: str) -> List[str]:
+    """
+    Record an upload, dropping expired entries and the oldest ones over UPLOAD_CACHE_MAX_ENTRIES
+    
+    Returns:
+        Names of evicted files that are still live on Gemini and should be deleted
+    """
+    now = time.time()
+    with _upload_cache_lock:
+        cache = _load_upload_cache()
+        for key in [key for key, (_, uploaded_at) in cache.items() if now - uploaded_at > UPLOAD_CACHE_TTL_SECONDS]:
+            del cache[key]
+        cache[digest] = (name, now)
+        evicted = []
+        if len(cache) > UPLOAD_CACHE_MAX_ENTRIES:
+            for key in sorted(cache, key=lambda key: cache[key][1])[:len(cache) - UPLOAD_CACHE_MAX_ENTRIES]:
+                evicted.append(cache.pop(key)[0])
+        _save_upload_cache(cache)
+        return evicted
+
+
+# Comprehensive analysis prompt sent with every video
+ANALYSIS_PROMPT = """
+            Please analyze this video comprehensively and provide:
+            
+            1. A detailed summary of the video content in exactly one paragraph (3-5 sentences)
+            2. Key visual elements, objects, people, or scenes observed
+            3. Any text or signage visible in the video
+            4. The overall theme, purpose, or context of the video
+            5. Notable activities, actions, or events happening
+            6. Technical aspects like video quality, lighting, camera work if relevant
+            
+            Format your response as a JSON object with these fields:
+            - summary: One paragraph summary (3-5 sentences)
+            - key_elements: List of key visual components
+            - visible_text: Any text/signage visible in the video
+            - theme: Overall theme or purpose
+            - activities: Notable activities or events
+            - technical_notes: Technical observations
+            - confidence: Your confidence level (0.0-1.0) in this analysis
+            
+            Focus on being descriptive and comprehensive while keeping the summary concise.
+            """
 
 
 class VideoAnalysisService:
     """Service for analyzing video files using Google Gemini"""
     
+    # Stateless, so one decoder is shared by every call
+    _json_decoder = json.JSONDecoder()
+    
     def __init__(self, api_key: str):
         """Initialize the video analysis service with Gemini API key"""
         self.api_key = api_key
-        genai.configure(api_key=api_key)
+        # Shared process-wide so the SDK's gRPC channel isn't rebuilt per service
+        Config.configure_genai(api_key)
         
         # Initialize the Gemini model with vision capabilities
         self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
         
-        print(f"[VIDEO] Video Analysis Service initialized")
+        logger.info("[VIDEO] Video Analysis Service initialized")
     
-    def analyze_video(self, video_path: str, filename: str = "video") -> Dict[str, Any]:
+    def analyze_video(self, video_path: str, filename: str = "video") -> VideoAnalysisResult:
         """
         Analyze video file and generate a comprehensive summary
         
@@ -32,157 +215,327 @@ class VideoAnalysisService:
             filename: Original filename for context
             
         Returns:
-            Dictionary containing analysis results
+            VideoAnalysisResult with the analysis (error set if it failed)
         """
+        file_size = 0
+        mime_type = 'unknown'
         try:
-            print(f"[VIDEO] Starting analysis of video: {filename}")
-            
-            # Validate file exists and get info
-            if not os.path.exists(video_path):
-                raise FileNotFoundError(f"Video file not found: {video_path}")
+            logger.info("[VIDEO] Starting analysis of video: %s", filename)
+            file_size, mime_type = self._inspect_video(video_path)
             
-            file_size = os.path.getsize(video_path)
-            file_size_mb = file_size / (1024 * 1024)
-            
-            print(f"[VIDEO] Video file size: {file_size_mb:.2f} MB")
-            
-            # Check file size limit (100MB for videos)
-            if file_size > 100 * 1024 * 1024:
-                raise ValueError(f"Video file too large: {file_size_mb:.1f} MB (max: 100MB)")
-            
-            # Get MIME type
-            mime_type, _ = mimetypes.guess_type(video_path)
-            if not mime_type or not mime_type.startswith('video/'):
-                # Try to infer from extension
-                ext = os.path.splitext(video_path)[1].lower()
-                mime_map = {
-                    '.mp4': 'video/mp4',
-                    '.avi': 'video/x-msvideo',
-                    '.mov': 'video/quicktime',
-                    '.mkv': 'video/x-matroska',
-                    '.webm': 'video/webm'
-                }
-                mime_type = mime_map.get(ext, 'video/mp4')
-            
-            print(f"[VIDEO] Detected MIME type: {mime_type}")
-            
-            # Upload video to Gemini
-            print(f"[VIDEO] Uploading video file to Gemini...")
-            video_file = genai.upload_file(path=video_path, mime_type=mime_type)
-            print(f"[VIDEO] Video uploaded successfully: {video_file.name}")
+            video_file = self._get_or_upload_file(video_path, mime_type)
             
             # Wait for processing to complete
-            print(f"[VIDEO] Waiting for video processing...")
-            import time
+            logger.info("[VIDEO] Waiting for video processing...")
+            delay = PROCESSING_POLL_INITIAL_DELAY
             while video_file.state.name == "PROCESSING":
-                print(".", end="", flush=True)
-                time.sleep(2)
+                time.sleep(delay)
+                delay = min(delay * PROCESSING_POLL_BACKOFF, PROCESSING_POLL_MAX_DELAY)
                 video_file = genai.get_file(video_file.name)
             
             if video_file.state.name == "FAILED":
                 raise Exception("Video processing failed in Gemini")
             
-            print(f"\n[VIDEO] Video processing completed")
+            logger.info("[VIDEO] Video processing completed")
             
-            # Create comprehensive analysis prompt
-            analysis_prompt = """
-            Please analyze this video comprehensively and provide:
+            # Generate analysis
+            logger.info("[VIDEO] Generating video analysis...")
+            response = self.model.generate_content([video_file, ANALYSIS_PROMPT])
             
-            1. A detailed summary of the video content in exactly one paragraph (3-5 sentences)
-            2. Key visual elements, objects, people, or scenes observed
-            3. Any text or signage visible in the video
-            4. The overall theme, purpose, or context of the video
-            5. Notable activities, actions, or events happening
-            6. Technical aspects like video quality, lighting, camera work if relevant
+            return self._build_result(response, filename, file_size, mime_type)
             
-            Format your response as a JSON object with these fields:
-            - summary: One paragraph summary (3-5 sentences)
-            - key_elements: List of key visual components
-            - visible_text: Any text/signage visible in the video
-            - theme: Overall theme or purpose
-            - activities: Notable activities or events
-            - technical_notes: Technical observations
-            - confidence: Your confidence level (0.0-1.0) in this analysis
+        except Exception as e:
+            return self._error_result(e, filename, file_size, mime_type)
+    
+    async def analyze_video_async(self, video_path: str, filename: str = "video") -> VideoAnalysisResult:
+        """
+        Async version of analyze_video; the File API calls run in worker threads
+        and processing is polled with asyncio.sleep, so many videos can be
+        analyzed concurrently without blocking the event loop
+        
+        Args:
+            video_path: Path to the video file
+            filename: Original filename for context
             
-            Focus on being descriptive and comprehensive while keeping the summary concise.
-            """
+        Returns:
+            VideoAnalysisResult with the analysis (error set if it failed)
+        """
+        return await self._analyze_video_async(video_path, filename, contextlib.nullcontext())
+    
+    async def analyze_videos_batch(self,
+                                   video_paths: List[str],
+                                   filenames: Optional[List[str]] = None) -> List[VideoAnalysisResult]:
+        """
+        Analyze several videos concurrently
+        
+        At most VIDEO_BATCH_MAX_CONCURRENCY uploads and generations run at once;
+        waiting for Gemini-side processing does not hold a slot.
+        
+        Args:
+            video_paths: Paths to the video files
+            filenames: Original filenames for context (defaults to the path basenames)
             
-            # Generate analysis
-            print(f"[VIDEO] Generating video analysis...")
-            response = self.model.generate_content([video_file, analysis_prompt])
+        Returns:
+            List of VideoAnalysisResult objects in input order
+        """
+        if filenames is None:
+            filenames = [os.path.basename(path) for path in video_paths]
+        
+        logger.info("[VIDEO] Starting batch analysis of %d videos", len(video_paths))
+        limit = asyncio.Semaphore(VIDEO_BATCH_MAX_CONCURRENCY)
+        results = await asyncio.gather(*(
+            self._analyze_video_async(path, filename, limit)
+            for path, filename in zip(video_paths, filenames)
+        ))
+        
+        successful = sum(1 for r in results if not r.error)
+        logger.info("[VIDEO] ✅ Batch analysis completed: %d/%d successful", successful, len(results))
+        return list(results)
+    
+    async def _analyze_video_async(self, video_path: str, filename: str, limit) -> VideoAnalysisResult:
+        """
+        Upload, wait for and analyze one video
+        
+        Args:
+            video_path: Path to the video file
+            filename: Original filename for context
+            limit: Async context manager held around the upload and generate stages
             
-            # Clean up the uploaded file from Gemini
-            try:
-                genai.delete_file(video_file.name)
-                print(f"[VIDEO] Cleaned up uploaded file from Gemini")
-            except Exception as cleanup_error:
-                print(f"[VIDEO] Warning: Could not clean up file: {cleanup_error}")
+        Returns:
+            VideoAnalysisResult with the analysis (error set if it failed)
+        """
+        file_size = 0
+        mime_type = 'unknown'
+        try:
+            logger.info("[VIDEO] Starting analysis of video: %s", filename)
+            file_size, mime_type = self._inspect_video(video_path)
+            
+            async with limit:
+                video_file = await self._upload(video_path, mime_type)
+            video_file = await self._wait_active(video_file)
+            async with limit:
+                response = await self._generate(video_file)
             
-            if not response or not response.text:
-                raise Exception("No response received from Gemini")
+            return self._build_result(response, filename, file_size, mime_type)
+            
+        except Exception as e:
+            return self._error_result(e, filename, file_size, mime_type)
+    
+    async def _upload(self, video_path: str, mime_type: str):
+        """Upload a video to Gemini's File API, or reuse an earlier upload of the same content"""
+        return await asyncio.to_thread(self._get_or_upload_file, video_path, mime_type)
+    
+    def _get_or_upload_file(self, video_path: str, mime_type: str):
+        """
+        Return a Gemini file for the video, reusing an earlier upload of identical content
+        
+        Uploads are left on Gemini for reuse and only deleted when evicted from the cache.
+        
+        Args:
+            video_path: Path to the video file
+            mime_type: Video MIME type
             
-            # Try to parse JSON response, fallback to text if needed
-            analysis_text = response.text.strip()
+        Returns:
+            Gemini File handle
+        """
+        # One open serves both the hash and the upload
+        with _open_sequential(video_path) as stream:
+            digest = _stream_sha256(stream)
+            cached_name = _cached_upload_name(digest)
+            if cached_name:
+                try:
+                    video_file = genai.get_file(cached_name)
+                    if video_file.state.name != "FAILED":
+                        logger.info("[VIDEO] Reusing uploaded video file: %s", video_file.name)
+                        return video_file
+                except Exception as e:
+                    logger.info("[VIDEO] Cached upload unavailable, uploading again: %s", e)
             
+            # Upload video to Gemini
+            logger.info("[VIDEO] Uploading video file to Gemini...")
+            display_name = os.path.basename(video_path)
             try:
-                import json
-                # Look for JSON in the response
-                if '{' in analysis_text and '}' in analysis_text:
-                    start_idx = analysis_text.find('{')
-                    end_idx = analysis_text.rfind('}') + 1
-                    json_str = analysis_text[start_idx:end_idx]
-                    analysis_result = json.loads(json_str)
-                else:
-                    raise ValueError("No JSON found in response")
-            except (json.JSONDecodeError, ValueError):
-                # Fallback to structured text parsing
-                print(f"[VIDEO] Could not parse JSON response, using fallback parsing")
-                analysis_result = self._parse_text_response(analysis_text)
-            
-            # Ensure all required fields are present
-            required_fields = ['summary', 'key_elements', 'visible_text', 'theme', 'activities', 'technical_notes', 'confidence']
-            for field in required_fields:
-                if field not in analysis_result:
-                    analysis_result[field] = "Not specified" if field != 'confidence' else 0.8
-            
-            # Ensure summary is a single paragraph
-            if isinstance(analysis_result.get('summary'), list):
-                analysis_result['summary'] = ' '.join(analysis_result['summary'])
-            
-            # Add metadata
-            analysis_result.update({
-                'filename': filename,
-                'file_size_mb': round(file_size_mb, 2),
-                'mime_type': mime_type,
-                'analysis_type': 'video',
-                'processed_by': 'gemini-2.0-flash-exp'
-            })
-            
-            print(f"[VIDEO] Video analysis completed successfully")
-            return analysis_result
+                video_file = self._stream_upload(stream, mime_type, display_name)
+            except (requests.RequestException, KeyError, ValueError) as e:
+                logger.warning("[VIDEO] ⚠️ Streaming upload failed, retrying through the SDK: %s", e)
+                stream.seek(0)
+                video_file = genai.upload_file(path=stream, mime_type=mime_type, display_name=display_name)
+            logger.info("[VIDEO] Video uploaded successfully: %s", video_file.name)
+        
+        for evicted_name in _remember_upload(digest, video_file.name):
+            self._delete_uploaded_file(evicted_name)
+        return video_file
+    
+    def _stream_upload(self, stream, mime_type: str, display_name: str):
+        """
+        Upload an open video with the File API's resumable protocol
+        
+        genai.upload_file reads each (up to 100MB) chunk into memory before sending it;
+        here the open file is the request body, so it is read while it is sent.
+        
+        Args:
+            stream: Binary file object, uploaded from its start
+            mime_type: Video MIME type
+            display_name: Name shown for the file in Gemini
             
-        except Exception as e:
-            print(f"[VIDEO] Error analyzing video: {str(e)}")
-            # Return error result
-            return {
-                'summary': f"Error analyzing video: {str(e)}",
-                'key_elements': [],
-                'visible_text': "",
-                'theme': "Error",
-                'activities': [],
-                'technical_notes': f"Analysis failed: {str(e)}",
-                'confidence': 0.0,
-                'filename': filename,
-                'file_size_mb': file_size / (1024 * 1024) if 'file_size' in locals() else 0,
-                'mime_type': mime_type if 'mime_type' in locals() else 'unknown',
-                'analysis_type': 'video',
-                'processed_by': 'gemini-2.0-flash-exp',
-                'error': str(e)
-            }
+        Returns:
+            Gemini File handle
+        """
+        size = os.fstat(stream.fileno()).st_size
+        session = _upload_session()
+        
+        start = session.post(
+            GEMINI_UPLOAD_URL,
+            params={'key': self.api_key},
+            headers={
+                'X-Goog-Upload-Protocol': 'resumable',
+                'X-Goog-Upload-Command': 'start',
+                'X-Goog-Upload-Header-Content-Length': str(size),
+                'X-Goog-Upload-Header-Content-Type': mime_type,
+            },
+            json={'file': {'display_name': display_name}},
+            timeout=GEMINI_UPLOAD_TIMEOUT,
+        )
+        start.raise_for_status()
+        
+        stream.seek(0)
+        response = session.post(
+            start.headers['X-Goog-Upload-URL'],
+            headers={
+                'Content-Length': str(size),
+                'X-Goog-Upload-Offset': '0',
+                'X-Goog-Upload-Command': 'upload, finalize',
+            },
+            data=stream,
+            timeout=GEMINI_UPLOAD_TIMEOUT,
+        )
+        response.raise_for_status()
+        return genai.get_file(response.json()['file']['name'])
+    
+    @staticmethod
+    async def _wait_active(video_file):
+        """Poll an uploaded video with backoff until Gemini has finished processing it"""
+        logger.info("[VIDEO] Waiting for video processing...")
+        delay = PROCESSING_POLL_INITIAL_DELAY
+        while video_file.state.name == "PROCESSING":
+            await asyncio.sleep(delay)
+            delay = min(delay * PROCESSING_POLL_BACKOFF, PROCESSING_POLL_MAX_DELAY)
+            video_file = await asyncio.to_thread(genai.get_file, video_file.name)
+        
+        if video_file.state.name == "FAILED":
+            raise Exception("Video processing failed in Gemini")
+        
+        logger.info("[VIDEO] Video processing completed")
+        return video_file
+    
+    async def _generate(self, video_file):
+        """Generate the analysis for a processed video"""
+        logger.info("[VIDEO] Generating video analysis...")
+        return await self.model.generate_content_async([video_file, ANALYSIS_PROMPT])
+    
+    @staticmethod
+    def _inspect_video(video_path: str) -> Tuple[int, str]:
+        """
+        Validate the video file and work out its MIME type
+        
+        Returns:
+            (file size in bytes, MIME type)
+        """
+        # Validate file exists and get info with a single stat call
+        try:
+            file_size = os.stat(video_path).st_size
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Video file not found: {video_path}")
+        
+        file_size_mb = file_size / (1024 * 1024)
+        
+        logger.info("[VIDEO] Video file size: %.2f MB", file_size_mb)
+        
+        # Check file size limit (100MB for videos)
+        if file_size > 100 * 1024 * 1024:
+            raise ValueError(f"Video file too large: {file_size_mb:.1f} MB (max: 100MB)")
+        
+        # Get MIME type
+        mime_type, _ = mimetypes.guess_type(video_path)
+        if not mime_type or not mime_type.startswith('video/'):
+            # Try to infer from extension
+            ext = os.path.splitext(video_path)[1].lower()
+            mime_type = _VIDEO_MIME_TYPES.get(ext, 'video/mp4')
+        
+        logger.info("[VIDEO] Detected MIME type: %s", mime_type)
+        return file_size, mime_type
+    
+    @staticmethod
+    def _delete_uploaded_file(name: str) -> None:
+        """Remove an uploaded video from Gemini, logging rather than raising on failure"""
+        try:
+            genai.delete_file(name)
+            logger.info("[VIDEO] Cleaned up uploaded file from Gemini")
+        except Exception as cleanup_error:
+            logger.warning("[VIDEO] ⚠️ Could not clean up file: %s", cleanup_error)
+    
+    def _build_result(self, response, filename: str, file_size: int, mime_type: str) -> VideoAnalysisResult:
+        """Turn Gemini's analysis response into a VideoAnalysisResult"""
+        if not response or not response.text:
+            raise Exception("No response received from Gemini")
+        
+        # Try to parse JSON response, fallback to text if needed
+        analysis_text = response.text.strip()
+        
+        try:
+            # Decode forward from the first '{'; raw_decode stops at the end of the object,
+            # so prose or stray braces after it don't break the parse
+            start_idx = analysis_text.find('{')
+            if start_idx < 0:
+                raise ValueError("No JSON found in response")
+            analysis_result, _ = self._json_decoder.raw_decode(analysis_text, start_idx)
+        except (json.JSONDecodeError, ValueError):
+            # Fallback to structured text parsing
+            logger.info("[VIDEO] Could not parse JSON response, using fallback parsing")
+            analysis_result = self._parse_text_response(analysis_text)
+        
+        # Ensure summary is a single paragraph
+        summary = analysis_result.get('summary', "Not specified")
+        if isinstance(summary, list):
+            summary = ' '.join(summary)
+        
+        # Fields Gemini left out are reported as "Not specified"
+        result = VideoAnalysisResult(
+            summary=summary,
+            key_elements=analysis_result.get('key_elements', "Not specified"),
+            visible_text=analysis_result.get('visible_text', "Not specified"),
+            theme=analysis_result.get('theme', "Not specified"),
+            activities=analysis_result.get('activities', "Not specified"),
+            technical_notes=analysis_result.get('technical_notes', "Not specified"),
+            confidence=analysis_result.get('confidence', 0.8),
+            filename=filename,
+            file_size_mb=round(file_size / (1024 * 1024), 2),
+            mime_type=mime_type
+        )
+        
+        logger.info("[VIDEO] Video analysis completed successfully")
+        return result
+    
+    @staticmethod
+    def _error_result(error: Exception, filename: str, file_size: int, mime_type: str) -> VideoAnalysisResult:
+        """Result returned when analysis fails"""
+        logger.error("[VIDEO] ❌ Error analyzing video: %s", error)
+        return VideoAnalysisResult(
+            summary=f"Error analyzing video: {str(error)}",
+            key_elements=[],
+            visible_text="",
+            theme="Error",
+            activities=[],
+            technical_notes=f"Analysis failed: {str(error)}",
+            confidence=0.0,
+            filename=filename,
+            file_size_mb=file_size / (1024 * 1024),
+            mime_type=mime_type,
+            error=str(error)
+        )
     
     def _parse_text_response(self, text: str) -> Dict[str, Any]:
         """Fallback parser for non-JSON responses"""
-        lines = text.split('\n')
         result = {
             'summary': '',
             'key_elements': [],
@@ -193,30 +546,33 @@ class VideoAnalysisService:
             'confidence': 0.8
         }
         
-        current_section = None
         summary_lines = []
+        summary_length = 0
         
-        for line in lines:
+        # Lowercase the whole response once; lower() never adds or removes newlines,
+        # so its lines stay aligned with the original ones
+        for line, lowered in zip(text.split('\n'), text.lower().split('\n')):
             line = line.strip()
             if not line:
                 continue
                 
             # Extract summary (first substantial paragraph)
             if not result['summary'] and len(line) > 50 and '.' in line:
+                summary_length += len(line) + (1 if summary_lines else 0)
                 summary_lines.append(line)
-                if len(' '.join(summary_lines)) > 100:  # Reasonable summary length
+                if summary_length > 100:  # Reasonable summary length
                     result['summary'] = ' '.join(summary_lines)
             
-            # Look for key elements, activities, etc.
-            if 'element' in line.lower() or 'object' in line.lower():
+            # Look for key elements, activities, etc.; the first matching section wins
+            if 'element' in lowered or 'object' in lowered:
                 result['key_elements'].append(line)
-            elif 'text' in line.lower() or 'sign' in line.lower():
+            elif 'text' in lowered or 'sign' in lowered:
                 result['visible_text'] = line
-            elif 'theme' in line.lower() or 'purpose' in line.lower():
+            elif 'theme' in lowered or 'purpose' in lowered:
                 result['theme'] = line
-            elif 'activit' in line.lower() or 'action' in line.lower():
+            elif 'activit' in lowered or 'action' in lowered:
                 result['activities'].append(line)
-            elif 'technical' in line.lower() or 'quality' in line.lower():
+            elif 'technical' in lowered or 'quality' in lowered:
                 result['technical_notes'] = line
         
         # Use the full text as summary if we couldn't extract one
@@ -1,8 +1,92 @@
 """
 Document type detection utility
-Identifies document types based on file extensions
+Identifies document types based on file content signatures and file extensions
 """
 
+import functools
+import io
+import zipfile
+
+# Leading "magic" bytes that identify a supported format on their own, checked in order
+_SIGNATURES = (
+    (b'%PDF', "pdf"),
+    (b'\xff\xd8\xff', "image"),  # JPEG
+    (b'\x89PNG\r\n\x1a\n', "image"),  # PNG
+    (b'GIF8', "image"),  # GIF87a / GIF89a
+)
+
+# Containers shared with other formats, only trusted after a closer look:
+# any ZIP (.xlsx, .pptx, .zip) starts like DOCX, any OLE2 file (.xls, .ppt, .msg)
+# like legacy Word, and "BM" is an ordinary two-character text prefix
+_ZIP_SIGNATURE = b'PK\x03\x04'
+_OLE2_SIGNATURE = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+_BMP_SIGNATURE = b'BM'
+_DOCX_MAIN_PART = 'word/document.xml'
+
+# File extensions of the supported formats
+_EXTENSION_TYPES = {
+    '.pdf': "pdf",
+    '.doc': "doc",
+    '.docx': "docx",
+    '.jpg': "image",
+    '.jpeg': "image",
+    '.png': "image",
+    '.bmp': "image",
+    '.gif': "image",
+}
+
+def _is_docx(file_bytes: bytes) -> bool:
+    """Whether a ZIP container holds a Word document body"""
+    try:
+        with zipfile.ZipFile(io.BytesIO(file_bytes)) as archive:
+            archive.getinfo(_DOCX_MAIN_PART)
+        return True
+    except (zipfile.BadZipFile, KeyError):
+        return False
+
+def _is_bmp(file_bytes: bytes) -> bool:
+    """Whether the BITMAPFILEHEADER's file size field matches the content length"""
+    return len(file_bytes) >= 14 and int.from_bytes(file_bytes[2:6], 'little') == len(file_bytes)
+
+def detect_document_type_from_bytes(file_bytes: bytes, filename: str = "") -> str:
+    """
+    Detect document type from the leading bytes of the file content
+    
+    PDF, JPEG, PNG and GIF are recognized from their signatures alone. A ZIP is
+    DOCX only if it contains word/document.xml; OLE2 and BMP signatures are only
+    trusted when the filename's extension agrees (.doc, .bmp).
+    
+    Args:
+        file_bytes: Raw bytes of the uploaded file
+        filename: Original filename, used to confirm ambiguous signatures
+        
+    Returns:
+        str: "pdf", "doc", "docx", "image", or "unknown" (callers then fall back
+        to detect_document_type)
+    """
+    if not file_bytes:
+        return "unknown"
+    
+    header = file_bytes[:16]
+    for signature, doc_type in _SIGNATURES:
+        if header.startswith(signature):
+            return doc_type
+    
+    if header.startswith(_ZIP_SIGNATURE):
+        return "docx" if _is_docx(file_bytes) else "unknown"
+    
+    extension = filename[filename.rfind('.'):].lower() if '.' in filename else ""
+    if header.startswith(_OLE2_SIGNATURE) and extension == '.doc':
+        return "doc"
+    if header.startswith(_BMP_SIGNATURE) and extension == '.bmp' and _is_bmp(file_bytes):
+        return "image"
+    return "unknown"
+
+@functools.lru_cache(maxsize=64)
+def _extension_type(extension: str) -> str:
+    """Document type for a file extension such as '.PDF' (case-insensitive)"""
+    return _EXTENSION_TYPES.get(extension.lower(), "unknown")
+
 def detect_document_type(filename: str) -> str:
     """
     Detect document type based on file extension
@@ -15,16 +99,9 @@ def detect_document_type(filename: str) -> str:
     """
     if not filename:
         return "unknown"
-        
-    lower_filename = filename.lower()
     
-    if lower_filename.endswith('.pdf'):
-        return "pdf"
-    elif lower_filename.endswith('.doc'):
-        return "doc"
-    elif lower_filename.endswith('.docx'):
-        return "docx"
-    elif any(lower_filename.endswith(ext) for ext in ['.jpg', '.jpeg', '.png', '.bmp', '.gif']):
-        return "image"
-    else:
-        return "unknown"
\ No newline at end of file
+    # Only the extension is lowercased and resolved, so every file sharing it hits one cache entry
+    dot = filename.rfind('.')
+    if dot < 0:
+        return "unknown"
+    return _extension_type(filename[dot:])
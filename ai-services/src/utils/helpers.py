@@ -1,6 +1,7 @@
 # DataTrack KMRL - Helper Utilities
 # Utilities for document processing
 
+import functools
 import uuid
 import re
 import os
@@ -8,34 +9,63 @@ import time
 from typing import Dict, List, Any, Optional, Union
 from datetime import datetime
 
+_MIME_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.pdf': 'application/pdf',
+    '.doc': 'application/msword',
+    '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    '.txt': 'text/plain'
+}
+_IMAGE_EXTENSIONS = frozenset(['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp'])
+_DOCUMENT_EXTENSIONS = frozenset(['.pdf', '.doc', '.docx', '.txt', '.rtf'])
+_WORD_CONTENT_TYPES = frozenset([
+    'application/msword',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+])
+
+# Common form field patterns, compiled once at import
+_FORM_FIELD_PATTERNS = {
+    'name': re.compile(r'(?i)name\s*[:]\s*([\w\s]+)'),
+    'email': re.compile(r'(?i)email\s*[:]\s*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})'),
+    'phone': re.compile(r'(?i)phone\s*[:]\s*([\d\s\+\-\(\)]{8,})'),
+    'address': re.compile(r'(?i)address\s*[:]\s*([\w\s,.#\-]+)'),
+    'date': re.compile(r'(?i)date\s*[:]\s*(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{2,4})'),
+    'id': re.compile(r'(?i)id\s*[:]\s*([\w\d\-]+)')
+}
+
+# Deletion table: str.translate drops these in one C-level pass without the regex engine
+_INVALID_FILENAME_CHARS = str.maketrans('', '', '<>:"/\\|?*')
+
+# Runs rather than single characters, so Malayalam text yields few matches
+_MALAYALAM_RUNS = re.compile('[\u0D00-\u0D7F]+')
+
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
 def generate_processing_id() -> str:
     """Generate a unique processing ID for document tracking"""
     return str(uuid.uuid4())
 
+# The helpers below see a handful of distinct extensions and content types, so their
+# results are memoized; the caches are bounded because filenames are client-supplied
+@functools.lru_cache(maxsize=64)
 def get_file_extension(filename: str) -> str:
     """Get the file extension from a filename"""
     return os.path.splitext(filename)[1].lower()
 
+@functools.lru_cache(maxsize=64)
 def get_mime_type(file_extension: str) -> str:
     """Get the MIME type from a file extension"""
-    mime_types = {
-        '.jpg': 'image/jpeg',
-        '.jpeg': 'image/jpeg',
-        '.png': 'image/png',
-        '.pdf': 'application/pdf',
-        '.doc': 'application/msword',
-        '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-        '.txt': 'text/plain'
-    }
-    return mime_types.get(file_extension.lower(), 'application/octet-stream')
+    return _MIME_TYPES.get(file_extension.lower(), 'application/octet-stream')
 
 def is_image_file(file_extension: str) -> bool:
     """Check if a file is an image based on extension"""
-    return file_extension.lower() in ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp']
+    return file_extension.lower() in _IMAGE_EXTENSIONS
 
 def is_document_file(file_extension: str) -> bool:
     """Check if a file is a document based on extension"""
-    return file_extension.lower() in ['.pdf', '.doc', '.docx', '.txt', '.rtf']
+    return file_extension.lower() in _DOCUMENT_EXTENSIONS
 
 def format_processing_time(seconds: float) -> str:
     """Format processing time in a human-readable format"""
@@ -55,18 +85,8 @@ def extract_form_fields_from_text(text: str) -> Dict[str, str]:
     """
     fields = {}
     
-    # Common form field patterns
-    patterns = {
-        'name': r'(?i)name\s*[:]\s*([\w\s]+)',
-        'email': r'(?i)email\s*[:]\s*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-        'phone': r'(?i)phone\s*[:]\s*([\d\s\+\-\(\)]{8,})',
-        'address': r'(?i)address\s*[:]\s*([\w\s,.#\-]+)',
-        'date': r'(?i)date\s*[:]\s*(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{2,4})',
-        'id': r'(?i)id\s*[:]\s*([\w\d\-]+)'
-    }
-    
-    for field, pattern in patterns.items():
-        match = re.search(pattern, text)
+    for field, pattern in _FORM_FIELD_PATTERNS.items():
+        match = pattern.search(text)
         if match:
             fields[field] = match.group(1).strip()
     
@@ -85,10 +105,15 @@ def is_malayalam_text(text: str, threshold: float = 0.3) -> bool:
     if not text:
         return False
     
-    # Count Malayalam characters (Unicode range)
-    malayalam_chars = sum(1 for char in text if '\u0D00' <= char <= '\u0D7F')
+    # Count Malayalam characters (Unicode range) in C: ASCII text has none, and
+    # otherwise the count is what a single regex pass removes
+    if text.isascii():
+        malayalam_chars = 0
+    else:
+        malayalam_chars = len(text) - len(_MALAYALAM_RUNS.sub('', text))
     return malayalam_chars > len(text) * threshold
 
+@functools.lru_cache(maxsize=128)
 def detect_file_type(content_type: str, file_extension: str) -> str:
     """
     Detect file type based on content type and extension
@@ -98,9 +123,7 @@ def detect_file_type(content_type: str, file_extension: str) -> str:
         return 'image'
     elif content_type == 'application/pdf' or file_extension == '.pdf':
         return 'pdf'
-    elif (content_type == 'application/msword' or 
-          content_type == 'application/vnd.openxmlformats-officedocument.wordprocessingml.document' or
-          file_extension in ['.doc', '.docx']):
+    elif content_type in _WORD_CONTENT_TYPES or file_extension in ('.doc', '.docx'):
         return 'word'
     elif content_type.startswith('text/') or file_extension == '.txt':
         return 'text'
@@ -110,7 +133,7 @@ def detect_file_type(content_type: str, file_extension: str) -> str:
 def sanitize_filename(filename: str) -> str:
     """Sanitize a filename to remove invalid characters"""
     # Remove invalid characters
-    filename = re.sub(r'[<>:"/\\|?*]', '', filename)
+    filename = filename.translate(_INVALID_FILENAME_CHARS)
     # Ensure it's not too long
     if len(filename) > 255:
         base, ext = os.path.splitext(filename)
@@ -119,16 +142,13 @@ def sanitize_filename(filename: str) -> str:
 
 def estimate_page_count(text_length: int) -> int:
     """Estimate page count based on text length"""
-    # Rough estimate: ~500 words per page, ~6 chars per word
-    chars_per_page = 3000
-    return max(1, int(text_length / chars_per_page))
+    # Rough estimate: ~500 words per page, ~6 chars per word (3000 chars per page)
+    return max(1, text_length // 3000)
 
 def format_bytes(size: int) -> str:
     """Format file size in bytes to a human-readable format"""
-    power = 2 ** 10  # 1024
-    n = 0
-    labels = {0: 'B', 1: 'KB', 2: 'MB', 3: 'GB', 4: 'TB'}
-    while size > power:
-        size /= power
-        n += 1
-    return f"{size:.2f} {labels[n]}"
+    if size <= 1024:
+        return f"{size:.2f} B"
+    # Largest unit the size is strictly above, from the bit length instead of repeated division
+    n = min(((size - 1).bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    return f"{size / (1 << (10 * n)):.2f} {_SIZE_UNITS[n]}"
@@ -3,7 +3,66 @@
 
 import re
 import unicodedata
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Tuple, Union
+
+# Patterns are compiled once at import instead of going through re's cache on every call
+# Written with literal prefixes (not {n,}) so the engine can skip ahead to candidates
+_EXCESS_NEWLINES = re.compile(r'\n\n\n+')
+_WHITESPACE_RUNS = re.compile(r'\s{2,}')
+_WORD_CHAR = re.compile(r'\w')
+_ZERO_WIDTH_CHARS = re.compile(r'[\u200B-\u200D\uFEFF]')
+_ZERO_WIDTH_LITERALS = ('\u200B', '\u200C', '\u200D', '\uFEFF')
+_KEY_VALUE = re.compile(r'([A-Za-z\s]+?):\s*(.+?)(?=\n|$)')
+_DATE_PATTERNS = [
+    re.compile(r'\b(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})\b'),  # DD/MM/YYYY or MM/DD/YYYY
+    re.compile(r'\b(\d{2,4}[/-]\d{1,2}[/-]\d{1,2})\b'),  # YYYY/MM/DD
+    re.compile(r'\b(\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{2,4})\b')  # 1 Jan 2023
+]
+_REFERENCE_PATTERNS = [
+    re.compile(r'\b(?:Ref(?:erence)?|Invoice|Order)\s*(?:No|Number|#)?[:\.\s]\s*([A-Za-z0-9\-\/]+)\b'),
+    re.compile(r'\b([A-Za-z0-9]{2,}[\-\/][A-Za-z0-9\-\/]+)\b')  # Common reference format like INV-12345
+]
+# l / O misread for 1 / 0 next to digits: followed by a digit, preceded by a digit, or between digits
+# The pattern starts with the literal class and checks context with lookbehinds afterwards, so
+# the engine's C search jumps between l/O candidates instead of trying lookarounds at every position
+_NUMERIC_CONTEXT_ERRORS = re.compile(r'[lO](?:(?<!\w[lO])(?=\d)|(?<=\d[lO])(?!\w)|(?<=\d[lO])(?=\d))')
+_NUMERIC_CONTEXT_FIXES = {'l': '1', 'O': '0'}
+# Table cells: words joined by single whitespace characters, ended by a wider gap
+_TABLE_CELL = re.compile(r'\S+(?:\s\S+)*')
+# Max distance in characters between cell starts that are treated as the same column
+TABLE_COLUMN_TOLERANCE = 2
+_NUMERIC_DATE = re.compile(r'(\d{1,2})[/-](\d{1,2})[/-](\d{2,4})')
+_TEXT_DATE = re.compile(r'(\d{1,2})\s+(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+(\d{2,4})', re.IGNORECASE)
+_MONTH_NUMBERS = {
+    'jan': '01', 'feb': '02', 'mar': '03', 'apr': '04',
+    'may': '05', 'jun': '06', 'jul': '07', 'aug': '08',
+    'sep': '09', 'oct': '10', 'nov': '11', 'dec': '12'
+}
+
+def _join_broken_words(text: str) -> str:
+    """
+    Join words split by a hyphen and newline ("main-\ntenance" -> "maintenance")
+    
+    Equivalent to re.sub(r'(\w)-\n(\w)', r'\1\2', text), but only the characters
+    around each "-\n" are inspected instead of trying the pattern at every word
+    character.
+    """
+    if '-\n' not in text:
+        return text
+    
+    parts = text.split('-\n')
+    pieces = [parts[0]]
+    # A joined word consumes the first character after the break, so a second break
+    # right after it is left alone, as with re.sub's non-overlapping matches
+    consumed = False
+    for previous, part in zip(parts, parts[1:]):
+        if not consumed and previous and part and _WORD_CHAR.match(previous[-1]) and _WORD_CHAR.match(part[0]):
+            consumed = len(part) == 1
+        else:
+            pieces.append('-\n')
+            consumed = False
+        pieces.append(part)
+    return ''.join(pieces)
 
 def clean_extracted_text(text: str) -> str:
     """
@@ -21,11 +80,17 @@ def clean_extracted_text(text: str) -> str:
     if not text:
         return ""
     
+    # Each whole-string pass is skipped when a C-level substring check shows it
+    # has nothing to change, so clean text is copied as few times as possible
+    
     # Replace multiple newlines with single newline
-    text = re.sub(r'\n{3,}', '\n\n', text)
+    # (repeated str.replace: each pass shortens every run, and OCR runs are short)
+    while '\n\n\n' in text:
+        text = text.replace('\n\n\n', '\n\n')
     
     # Replace multiple spaces with single space
-    text = re.sub(r' {2,}', ' ', text)
+    while '  ' in text:
+        text = text.replace('  ', ' ')
     
     # Fix common OCR errors
     text = text.replace('I-', 'I')  # Fix common error with capital I
@@ -33,18 +98,17 @@ def clean_extracted_text(text: str) -> str:
     text = text.replace('l-', 'I')  # l-hyphen to capital I
     
     # Fix broken words (words split by newline)
-    text = re.sub(r'(\w)-\n(\w)', r'\1\2', text)
+    text = _join_broken_words(text)
     
     # Normalize unicode characters
     text = unicodedata.normalize('NFKC', text)
     
     # Remove zero-width spaces and other invisible characters
-    text = re.sub(r'[\u200B-\u200D\uFEFF]', '', text)
+    if any(char in text for char in _ZERO_WIDTH_LITERALS):
+        text = _ZERO_WIDTH_CHARS.sub('', text)
     
     # Remove excessive trailing/leading whitespace on each line
-    lines = text.split('\n')
-    cleaned_lines = [line.strip() for line in lines]
-    text = '\n'.join(cleaned_lines)
+    text = '\n'.join([line.strip() for line in text.split('\n')])
     
     return text.strip()
 
@@ -63,8 +127,7 @@ def extract_structured_fields(text: str) -> Dict[str, str]:
     fields = {}
     
     # Extract key-value pairs (Field: Value)
-    kv_pattern = r'([A-Za-z\s]+?):\s*(.+?)(?=\n|$)'
-    matches = re.finditer(kv_pattern, text)
+    matches = _KEY_VALUE.finditer(text)
     
     for match in matches:
         key = match.group(1).strip()
@@ -82,26 +145,15 @@ def extract_structured_fields(text: str) -> Dict[str, str]:
         fields[key] = value
     
     # Extract date (various formats)
-    date_patterns = [
-        r'\b(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})\b',  # DD/MM/YYYY or MM/DD/YYYY
-        r'\b(\d{2,4}[/-]\d{1,2}[/-]\d{1,2})\b',  # YYYY/MM/DD
-        r'\b(\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{2,4})\b'  # 1 Jan 2023
-    ]
-    
-    for pattern in date_patterns:
-        match = re.search(pattern, text)
+    for pattern in _DATE_PATTERNS:
+        match = pattern.search(text)
         if match and 'Date' not in fields:
             fields['Date'] = match.group(1)
             break
     
     # Extract reference/invoice number
-    ref_patterns = [
-        r'\b(?:Ref(?:erence)?|Invoice|Order)\s*(?:No|Number|#)?[:\.\s]\s*([A-Za-z0-9\-\/]+)\b',
-        r'\b([A-Za-z0-9]{2,}[\-\/][A-Za-z0-9\-\/]+)\b'  # Common reference format like INV-12345
-    ]
-    
-    for pattern in ref_patterns:
-        match = re.search(pattern, text)
+    for pattern in _REFERENCE_PATTERNS:
+        match = pattern.search(text)
         if match and 'Reference' not in fields:
             fields['Reference'] = match.group(1)
             break
@@ -111,7 +163,7 @@ def extract_structured_fields(text: str) -> Dict[str, str]:
 def normalize_line_breaks(text: str) -> str:
     """Normalize line breaks for consistent paragraph structure"""
     # Replace multiple line breaks with double line break
-    text = re.sub(r'\n{3,}', '\n\n', text)
+    text = _EXCESS_NEWLINES.sub('\n\n', text)
     
     # Ensure paragraphs have double line breaks
     paragraphs = text.split('\n\n')
@@ -119,49 +171,40 @@ def normalize_line_breaks(text: str) -> str:
     
     return '\n\n'.join(normalized_paragraphs)
 
+_OCR_CORRECTIONS = {
+    # Numbers and special characters
+    'l': '1',  # lowercase l to 1 in numeric contexts
+    'O': '0',  # capital O to 0 in numeric contexts
+    
+    # Common errors
+    'rnm': 'mm',
+    'cl': 'd',
+    'rn': 'm',
+    'li': 'h',
+    
+    # Punctuation (curly quotes written as escapes so an editor can't flatten them)
+    '\u2018': "'",
+    '\u2019': "'",
+    '\u201c': '"',
+    '\u201d': '"',
+    '…': '...',
+    '–': '-',
+    '—': '-'
+}
+
+# Fixed-string corrections (l / O are context dependent and handled by _NUMERIC_CONTEXT_ERRORS),
+# matched in one pass; dict order keeps 'rnm' ahead of 'rn'
+_OCR_STRING_FIXES = {error: correction for error, correction in _OCR_CORRECTIONS.items()
+                     if error not in _NUMERIC_CONTEXT_FIXES and error != correction}
+_OCR_STRING_ERRORS = re.compile('|'.join(map(re.escape, _OCR_STRING_FIXES)))
+
 def correct_common_ocr_errors(text: str) -> str:
     """Correct common OCR errors in the text"""
-    corrections = {
-        # Numbers and special characters
-        'l': '1',  # lowercase l to 1 in numeric contexts
-        'O': '0',  # capital O to 0 in numeric contexts
-        
-        # Common errors
-        'rnm': 'mm',
-        'cl': 'd',
-        'rn': 'm',
-        'li': 'h',
-        
-        # Punctuation
-        ''': "'",
-        ''': "'",
-        '"': '"',
-        '"': '"',
-        '…': '...',
-        '–': '-',
-        '—': '-'
-    }
-    
-    # Apply corrections only in proper contexts
-    result = text
-    
-    # Fix lowercase l as 1 in numeric contexts
-    result = re.sub(r'(?<!\w)l(?=\d)', '1', result)  # l followed by digit
-    result = re.sub(r'(?<=\d)l(?!\w)', '1', result)  # l preceded by digit
-    result = re.sub(r'(?<=\d)l(?=\d)', '1', result)  # l between digits
-    
-    # Fix capital O as 0 in numeric contexts
-    result = re.sub(r'(?<!\w)O(?=\d)', '0', result)  # O followed by digit
-    result = re.sub(r'(?<=\d)O(?!\w)', '0', result)  # O preceded by digit
-    result = re.sub(r'(?<=\d)O(?=\d)', '0', result)  # O between digits
+    # Fix lowercase l as 1 and capital O as 0 in numeric contexts
+    result = _NUMERIC_CONTEXT_ERRORS.sub(lambda match: _NUMERIC_CONTEXT_FIXES[match.group()], text)
     
     # Simple replacements for punctuation and quotes
-    for error, correction in corrections.items():
-        if error in ['l', 'O']:  # Skip the ones we handled with regex
-            continue
-        result = result.replace(error, correction)
-    
-    return result
+    return _OCR_STRING_ERRORS.sub(lambda match: _OCR_STRING_FIXES[match.group()], result)
 
 def format_extracted_text(text: str, format_type: str = 'default') -> str:
     """
@@ -188,7 +231,7 @@ def format_extracted_text(text: str, format_type: str = 'default') -> str:
         
         for line in lines:
             # Replace multiple spaces with commas
-            csv_line = re.sub(r'\s{2,}', ',', line.strip())
+            csv_line = _WHITESPACE_RUNS.sub(',', line.strip())
             csv_lines.append(csv_line)
         
         return '\n'.join(csv_lines)
@@ -218,79 +261,102 @@ def format_extracted_text(text: str, format_type: str = 'default') -> str:
         # Just clean the text
         return clean_extracted_text(text)
 
-def extract_table_data(text: str) -> List[List[str]]:
+def _align_table_rows(rows: List[List[Tuple[int, str]]], centroids: List[float]) -> Optional[List[List[Optional[str]]]]:
+    """Place each cell in the column with the nearest centroid, or None if two cells of a row collide"""
+    table_data = []
+    for cells in rows:
+        row = [None] * len(centroids)
+        for start, cell in cells:
+            index = min(range(len(centroids)), key=lambda column: abs(centroids[column] - start))
+            if row[index] is not None:
+                return None
+            row[index] = cell
+        table_data.append(row)
+    return table_data
+
+def extract_table_data(text: str) -> List[List[Optional[str]]]:
     """
     Extract table data from text
     Uses whitespace alignment to identify table structure
     
+    Cells are separated by two or more spaces. Their start offsets across all rows
+    are clustered into columns and each cell goes to the column with the nearest
+    centroid, so rows line up and cells missing from a row are None. When the rows
+    don't line up (more columns than the widest row has cells, or two cells of a
+    row in one column), each row is returned as its own list of cells instead.
+    
     Args:
         text: OCR text with potential table
         
     Returns:
-        List of rows, each row is a list of cells
+        List of rows, each row is a list of cells (one per detected column when aligned)
     """
-    lines = text.split('\n')
-    table_data = []
-    
-    # Find lines with consistent spacing (potential table rows)
-    for line in lines:
-        # Skip empty lines
-        if not line.strip():
-            continue
-        
-        # Split by multiple spaces (potential cell delimiter)
-        cells = re.split(r'\s{2,}', line.strip())
-        
-        # If we have multiple cells, consider it a table row
+    # (start offset, cell text) per row; only lines with multiple cells are table rows
+    rows = []
+    for line in text.split('\n'):
+        cells = [(match.start(), match.group()) for match in _TABLE_CELL.finditer(line)]
         if len(cells) > 1:
-            table_data.append(cells)
-    
-    return table_data
+            rows.append(cells)
+    
+    if not rows:
+        return []
+    
+    # Group sorted start offsets into columns; a column spans at most
+    # TABLE_COLUMN_TOLERANCE characters from its first start, so nearby columns don't chain
+    clusters = []
+    for start in sorted({start for cells in rows for start, _ in cells}):
+        if clusters and start - clusters[-1][0] <= TABLE_COLUMN_TOLERANCE:
+            clusters[-1].append(start)
+        else:
+            clusters.append([start])
+    centroids = [sum(cluster) / len(cluster) for cluster in clusters]
+    
+    if len(centroids) <= max(len(cells) for cells in rows):
+        table_data = _align_table_rows(rows, centroids)
+        if table_data is not None:
+            return table_data
+    
+    # Columns don't line up consistently; keep each row's own cells
+    return [[cell for _, cell in cells] for cells in rows]
+
+def _expand_year(year: str) -> str:
+    """Convert a 2-digit year to a 4-digit year (51-99 -> 19xx, otherwise 20xx)"""
+    if len(year) == 2:
+        return ('19' if int(year) > 50 else '20') + year
+    return year
 
 def standardize_date_formats(text: str) -> str:
     """Standardize date formats to YYYY-MM-DD"""
-    # Pattern for DD/MM/YYYY or MM/DD/YYYY
-    pattern1 = r'(\d{1,2})[/-](\d{1,2})[/-](\d{2,4})'
+    # Matches are rewritten in a single walk that joins the untouched spans with the
+    # converted dates, instead of re.sub calling back into Python for every match
     
-    def replace_date(match):
-        day_or_month1 = int(match.group(1))
-        day_or_month2 = int(match.group(2))
-        year = match.group(3)
-        
-        # Convert 2-digit year to 4-digit year
-        if len(year) == 2:
-            century = '19' if int(year) > 50 else '20'
-            year = century + year
-        
+    # Pattern for DD/MM/YYYY or MM/DD/YYYY
+    parts = []
+    last = 0
+    for match in _NUMERIC_DATE.finditer(text):
+        day_or_month1 = int(match[1])
+        day_or_month2 = int(match[2])
+        year = _expand_year(match[3])
+        parts.append(text[last:match.start()])
         # Try to determine if it's DD/MM or MM/DD based on values
         if day_or_month1 > 12:  # Must be day
-            return f"{year}-{day_or_month2:02d}-{day_or_month1:02d}"
+            parts.append(f"{year}-{day_or_month2:02d}-{day_or_month1:02d}")
         else:  # Assume MM/DD
-            return f"{year}-{day_or_month1:02d}-{day_or_month2:02d}"
-    
-    # Replace dates
-    result = re.sub(pattern1, replace_date, text)
-    
-    # Pattern for text dates like "1 Jan 2023"
-    months = {
-        'jan': '01', 'feb': '02', 'mar': '03', 'apr': '04',
-        'may': '05', 'jun': '06', 'jul': '07', 'aug': '08',
-        'sep': '09', 'oct': '10', 'nov': '11', 'dec': '12'
-    }
-    
-    pattern2 = r'(\d{1,2})\s+(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+(\d{2,4})'
-    
-    def replace_text_date(match):
-        day = match.group(1)
-        month = match.group(2).lower()[:3]
-        year = match.group(3)
-        
-        # Convert 2-digit year to 4-digit year
-        if len(year) == 2:
-            century = '19' if int(year) > 50 else '20'
-            year = century + year
-        
-        return f"{year}-{months[month]}-{int(day):02d}"
-    
-    # Replace text dates (case insensitive)
-    return re.sub(pattern2, replace_text_date, result, flags=re.IGNORECASE)
+            parts.append(f"{year}-{day_or_month1:02d}-{day_or_month2:02d}")
+        last = match.end()
+    if parts:
+        parts.append(text[last:])
+        text = ''.join(parts)
+    
+    # Pattern for text dates like "1 Jan 2023" (case insensitive)
+    parts = []
+    last = 0
+    for match in _TEXT_DATE.finditer(text):
+        parts.append(text[last:match.start()])
+        parts.append(f"{_expand_year(match[3])}-{_MONTH_NUMBERS[match[2].lower()]}-{int(match[1]):02d}")
+        last = match.end()
+    if parts:
+        parts.append(text[last:])
+        text = ''.join(parts)
+    
+    return text
@@ -5,6 +5,8 @@ import sys
 import os
 import json
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
 
 # Add parent directories to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -46,33 +48,54 @@ test_texts = {
     """
 }
 
+# Classification requests sent at once
+MAX_CONCURRENT_REQUESTS = 8
+
+def classify_text(session: requests.Session, api_url: str, text: str) -> requests.Response:
+    """Send one text to the classification endpoint"""
+    # Prepare the request
+    request_data = {
+        "text": text,
+        "min_confidence": 0.0
+    }
+    
+    # Send the request
+    response = session.post(api_url, json=request_data)
+    response.raise_for_status()  # Raise an exception for HTTP errors
+    return response
+
 def test_classification_api():
     """Test the classification API endpoint"""
     api_url = "http://localhost:8001/api/classification/text"
     
-    for doc_type, text in test_texts.items():
-        print(f"\n--- TESTING {doc_type.upper()} DOCUMENT ---")
-        
-        # Prepare the request
-        request_data = {
-            "text": text,
-            "min_confidence": 0.0
+    # One keep-alive session shared by the worker threads, with a connection per worker
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=MAX_CONCURRENT_REQUESTS, pool_maxsize=MAX_CONCURRENT_REQUESTS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    
+    with session, ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+        futures = {
+            executor.submit(classify_text, session, api_url, text): doc_type
+            for doc_type, text in test_texts.items()
         }
         
-        try:
-            # Send the request
-            response = requests.post(api_url, json=request_data)
-            response.raise_for_status()  # Raise an exception for HTTP errors
-            
-            # Parse the response
-            result = response.json()
-            
-            # Print the result
-            print(f"Status Code: {response.status_code}")
-            print(f"Response: {json.dumps(result, indent=2)}")
+        # Results are printed as they arrive
+        for future in as_completed(futures):
+            print(f"\n--- TESTING {futures[future].upper()} DOCUMENT ---")
             
-        except requests.exceptions.RequestException as e:
-            print(f"Error: {e}")
+            try:
+                response = future.result()
+                
+                # Parse the response
+                result = response.json()
+                
+                # Print the result
+                print(f"Status Code: {response.status_code}")
+                print(f"Response: {json.dumps(result, indent=2)}")
+                
+            except requests.exceptions.RequestException as e:
+                print(f"Error: {e}")
 
 if __name__ == "__main__":
-    test_classification_api()
\ No newline at end of file
+    test_classification_api()
@@ -1,7 +1,18 @@
+import asyncio
 from typing import Dict, List, Optional
 import pinecone
 from ..config.settings import Config
 
+# Pinecone recommends up to 100 vectors per upsert request; batches are sent in parallel,
+# bounded so bursts stay under the index's request rate
+UPSERT_BATCH_SIZE = 100
+UPSERT_CONCURRENCY = 8
+
+# Rate-limited (HTTP 429) batches are retried with exponential backoff
+UPSERT_MAX_RETRIES = 3
+UPSERT_BACKOFF_BASE = 0.5
+UPSERT_BACKOFF_MAX = 8.0
+
 class PineconeService:
     def __init__(self):
         self._config = Config.get_pinecone_config()
@@ -24,12 +35,37 @@ class PineconeService:
             
         self.index = pinecone.Index(self._config["index_name"])
     
-    def upsert_vectors(self, vectors: List[Dict]):
+    async def upsert_vectors(
+        self,
+        vectors: List[Dict],
+        batch_size: int = UPSERT_BATCH_SIZE,
+        concurrency: int = UPSERT_CONCURRENCY
+    ) -> List[Dict]:
         """
-        Upsert vectors to Pinecone
+        Upsert vectors to Pinecone in parallel batches
         vectors: List of dictionaries containing 'id', 'values', and 'metadata'
+        batch_size: Vectors per upsert request
+        concurrency: Maximum upsert requests in flight
+        Returns the upsert response of each batch, in order
         """
-        return self.index.upsert(vectors=vectors)
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def _send(batch: List[Dict]):
+            async with semaphore:
+                return await self._upsert_batch(batch)
+        
+        batches = [vectors[i:i + batch_size] for i in range(0, len(vectors), batch_size)]
+        return list(await asyncio.gather(*(_send(batch) for batch in batches)))
+    
+    async def _upsert_batch(self, batch: List[Dict]):
+        """Upsert one batch on a worker thread, backing off and retrying when rate limited"""
+        for attempt in range(UPSERT_MAX_RETRIES + 1):
+            try:
+                return await asyncio.to_thread(self.index.upsert, vectors=batch)
+            except Exception as e:
+                if getattr(e, "status", None) != 429 or attempt == UPSERT_MAX_RETRIES:
+                    raise
+                await asyncio.sleep(min(UPSERT_BACKOFF_MAX, UPSERT_BACKOFF_BASE * 2 ** attempt))
     
     def query_vectors(
         self, 
@@ -1,8 +1,37 @@
+import functools
+import io
 from typing import Dict, Optional, BinaryIO
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError
 from ..config.settings import Config
 
+# Files above 8 MB are transferred as 8 MB parts, up to 10 at a time
+_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=10,
+    use_threads=True
+)
+
+@functools.lru_cache(maxsize=4)
+def _get_s3_client(region_name: str, aws_access_key_id: str, aws_secret_access_key: str):
+    """
+    Shared S3 client for the given credentials (boto3 clients are thread-safe)
+    Sized for concurrent requests and multipart transfers instead of the default 10 connections
+    """
+    return boto3.client(
+        's3',
+        aws_access_key_id=aws_access_key_id,
+        aws_secret_access_key=aws_secret_access_key,
+        region_name=region_name,
+        config=BotoConfig(
+            max_pool_connections=50,
+            retries={"max_attempts": 3, "mode": "adaptive"}
+        )
+    )
+
 class S3Service:
     def __init__(self):
         self._config = Config.get_s3_config()
@@ -10,11 +39,10 @@ class S3Service:
         
     def _init_s3(self):
         """Initialize S3 client"""
-        self.s3_client = boto3.client(
-            's3',
-            aws_access_key_id=self._config["aws_access_key_id"],
-            aws_secret_access_key=self._config["aws_secret_access_key"],
-            region_name=self._config["region_name"]
+        self.s3_client = _get_s3_client(
+            self._config["region_name"],
+            self._config["aws_access_key_id"],
+            self._config["aws_secret_access_key"]
         )
         self.bucket_name = self._config["bucket_name"]
         
@@ -36,7 +64,8 @@ class S3Service:
                 file_obj,
                 self.bucket_name,
                 s3_key,
-                ExtraArgs=extra_args
+                ExtraArgs=extra_args,
+                Config=_TRANSFER_CONFIG
             )
             
             # Generate a presigned URL for temporary access
@@ -56,12 +85,30 @@ class S3Service:
     
     def download_file(self, s3_key: str) -> Optional[bytes]:
         """Download a file from S3"""
+        try:
+            buffer = io.BytesIO()
+            self.s3_client.download_fileobj(
+                self.bucket_name,
+                s3_key,
+                buffer,
+                Config=_TRANSFER_CONFIG
+            )
+            return buffer.getvalue()
+        except ClientError:
+            return None
+    
+    def stream_file(self, s3_key: str) -> Optional[BinaryIO]:
+        """
+        Open a file in S3 for streaming
+        Returns a readable stream of the object's body, so callers can process it as
+        bytes arrive instead of waiting for the whole object; close it when done
+        """
         try:
             response = self.s3_client.get_object(
                 Bucket=self.bucket_name,
                 Key=s3_key
             )
-            return response['Body'].read()
+            return response['Body']
         except ClientError:
             return None
     
@@ -102,4 +149,6 @@ class S3Service:
                 Bucket=self.bucket_name,
                 Key=s3_key
             )
-            return response.get('Metadata', {})
\ No newline at end of file
+            return response.get('Metadata', {})
+        except ClientError:
+            return None